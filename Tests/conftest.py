@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent import HSNCodeAgent
+from data_loader import HSNDataLoader
+from database import HSNDatabase, iter_csv_records
+from json_catalog import export_json
+from snapshot import compile_snapshot
+
+CATALOG_CSV = os.path.join(ROOT, "Tests", "HSN_codes_cleaned.csv")
+BACKENDS = ("database", "csv", "json", "snapshot")
+
+
+@pytest.fixture(scope="session")
+def catalog_paths(tmp_path_factory):
+    """
+    The cleaned catalog in every source format, built once per test run.
+    """
+    directory = tmp_path_factory.mktemp("catalog")
+    paths = {"csv": CATALOG_CSV}
+
+    paths["database"] = str(directory / "hsn_codes.db")
+    db = HSNDatabase(paths["database"])
+    db.load_data_from_csv(CATALOG_CSV)
+    db.close()
+
+    paths["json"] = str(directory / "hsn_codes.json")
+    export_json(iter_csv_records(CATALOG_CSV), paths["json"])
+
+    paths["snapshot"] = str(directory / "hsn_codes.snap")
+    compile_snapshot(iter_csv_records(CATALOG_CSV), paths["snapshot"])
+    return paths
+
+
+@pytest.fixture(scope="session", params=BACKENDS)
+def loader(request, catalog_paths):
+    """
+    A loaded HSNDataLoader for each source type.
+    """
+    loader = HSNDataLoader(request.param, catalog_paths[request.param])
+    assert loader.load_data()
+    yield loader
+    loader.close()
+
+
+@pytest.fixture(scope="session", params=BACKENDS)
+def agent(request, catalog_paths):
+    """
+    An HSNCodeAgent for each source type.
+    """
+    agent = HSNCodeAgent(request.param, catalog_paths[request.param])
+    yield agent
+    agent.close()
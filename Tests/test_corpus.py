@@ -0,0 +1,37 @@
+import json
+
+from conftest import CATALOG_CSV
+from corpus import extract_directory, read_checkpoint
+
+
+def run(tmp_path, files):
+    return extract_directory([str(path) for path in files], str(tmp_path / "out.jsonl"), workers=1,
+                             checkpoint_path=str(tmp_path / "checkpoint"), data_source='csv',
+                             source_path=CATALOG_CSV)
+
+
+def output_rows(tmp_path):
+    with open(tmp_path / "out.jsonl", encoding='utf-8') as f:
+        return sorted((row['file'], row['start']) for row in map(json.loads, f))
+
+
+def test_resume_discards_results_written_after_the_last_checkpoint(tmp_path):
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    first.write_text("HSN 0101 and 01011010\n", encoding='utf-8')
+    second.write_text("HSN 0201\n", encoding='utf-8')
+    run(tmp_path, [first])
+    completed, output_size = read_checkpoint(str(tmp_path / "checkpoint"))
+    assert completed == {str(first)}
+    assert output_size == (tmp_path / "out.jsonl").stat().st_size
+
+    # A run that died after writing the second file's results, mid-way through its checkpoint line
+    with open(tmp_path / "out.jsonl", 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'file': str(second), 'start': 4}) + '\n')
+    with open(tmp_path / "checkpoint", 'a', encoding='utf-8') as f:
+        f.write(f"{output_size + 40}\t{second}")
+    assert read_checkpoint(str(tmp_path / "checkpoint")) == (completed, output_size)
+
+    stats = run(tmp_path, [first, second])
+    assert [stat['file'] for stat in stats] == [str(second)]
+    assert output_rows(tmp_path) == [(str(first), 4), (str(first), 13), (str(second), 4)]
+    assert read_checkpoint(str(tmp_path / "checkpoint"))[0] == {str(first), str(second)}
@@ -0,0 +1,92 @@
+import threading
+
+from database import HSNDatabase
+
+
+def test_bulk_load_reports_stats_without_printing(tmp_path, capsys):
+    db = HSNDatabase(str(tmp_path / "hsn_codes.db"))
+    assert db.bulk_load([('0101', 'LIVE HORSES'), ('01011010', 'PURE-BRED HORSES')]) == 2
+    db.close()
+
+    # Callers such as validate-batch stream JSONL on stdout
+    assert capsys.readouterr().out == ''
+    assert db.last_load_stats['records'] == 2
+
+
+def codes(db):
+    return db.cursor.execute("SELECT hsn_code, description FROM hsn_codes ORDER BY hsn_code").fetchall()
+
+
+def test_bulk_load_merges_with_existing_codes(tmp_path):
+    db = HSNDatabase(str(tmp_path / "hsn_codes.db"))
+    db.bulk_load([('0101', 'LIVE HORSES'), ('010121', 'PURE-BRED'), ('0101', 'LIVE HORSES, ASSES')])
+    db.bulk_load([('0201', 'MEAT'), ('010121', 'PURE-BRED BREEDING ANIMALS')])
+
+    # The last record of a code wins, as with INSERT OR REPLACE
+    assert codes(db) == [('0101', 'LIVE HORSES, ASSES'), ('010121', 'PURE-BRED BREEDING ANIMALS'), ('0201', 'MEAT')]
+    assert [record.hsn_code for record in db.get_parents('010121')] == ['0101']
+    assert db.get_dataset_version() == 2
+    db.close()
+
+
+def test_failed_bulk_load_leaves_database_unchanged(tmp_path):
+    db = HSNDatabase(str(tmp_path / "hsn_codes.db"))
+    db.bulk_load([('0101', 'LIVE HORSES')])
+
+    def failing_records():
+        for i in range(10):
+            yield f'02{i:02d}', f'MEAT {i}'
+        raise ValueError("bad row")
+
+    try:
+        db.bulk_load(failing_records(), batch_size=3)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the load should have failed")
+
+    assert codes(db) == [('0101', 'LIVE HORSES')]
+    assert db.get_dataset_version() == 1
+    assert db.cursor.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    db.close()
+
+
+def test_create_tables_drops_redundant_code_index(tmp_path):
+    db = HSNDatabase(str(tmp_path / "hsn_codes.db"))
+    db.connect()
+    # Layout of databases created before the unique index replaced the inline constraint
+    db.cursor.execute("CREATE TABLE hsn_codes (id INTEGER PRIMARY KEY AUTOINCREMENT, hsn_code TEXT NOT NULL, "
+                      "description TEXT NOT NULL, UNIQUE(hsn_code))")
+    db.cursor.execute("CREATE INDEX idx_hsn_code ON hsn_codes(hsn_code)")
+    db.conn.commit()
+
+    db.create_tables()
+    indexes = {row[1]: row[2] for row in db.cursor.execute("PRAGMA index_list(hsn_codes)")}
+    assert 'idx_hsn_code' not in indexes
+    assert sum(indexes.values()) == 1
+
+    db.bulk_load([('0101', 'LIVE HORSES')])
+    indexes = {row[1]: row[2] for row in db.cursor.execute("PRAGMA index_list(hsn_codes)")}
+    assert indexes == {'idx_hsn_code': 1, 'idx_hsn_parent': 0}
+    db.close()
+
+
+def test_read_connections_close_when_their_thread_exits(tmp_path):
+    # Characters that are special in SQLite URIs must not break the read-only connection
+    path = tmp_path / "dir with ?#% chars" / "hsn_codes.db"
+    path.parent.mkdir()
+    writer = HSNDatabase(str(path))
+    writer.bulk_load([('0101', 'LIVE HORSES'), ('01011010', 'PURE-BRED HORSES')])
+    writer.close()
+
+    db = HSNDatabase(str(path), read_only=True)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(db.get_parents('01011010'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [[record.hsn_code for record in parents] for parents in results] == [['0101']] * 8
+    assert len(db._pool) == 0
+    db.close()
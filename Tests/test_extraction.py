@@ -0,0 +1,50 @@
+import io
+import random
+
+from agent import iter_stream_matches
+from extraction import CANDIDATE_PATTERN
+
+INVOICE = ("Weight 10kg, GSTIN 27AAPFU0939F1ZV, invoice INV01011010, 5pcs of 0101, "
+           "HSN-01011010, Tel +91 98765 43210")
+
+
+def test_digits_inside_words_are_not_candidates():
+    # 10kg, the GSTIN, INV01011010 and the +91 dialling code are all rejected
+    assert CANDIDATE_PATTERN.findall(INVOICE) == ['0101', '01011010', '98765', '43210']
+
+
+def test_hsn_label_prefix_is_a_candidate():
+    assert CANDIDATE_PATTERN.findall("HSN-01011010, hsn-0101") == ['01011010', '0101']
+    assert CANDIDATE_PATTERN.findall("2024-05-15, 0101-0102, +91") == []
+
+
+def test_extract_rejects_codes_inside_words(agent):
+    results = agent.extract_hsn_codes(INVOICE)
+    assert [(result['code'], result['valid']) for result in results] == [('0101', True), ('01011010', True)]
+
+
+def test_stream_extraction_matches_whole_text(agent):
+    text = (INVOICE + ' ' + 'x' * 40 + '\n') * 3
+
+    def spans(chunk_size):
+        return [(result['code'], result['start'], result['end']) for result in
+                agent.extract_hsn_codes_stream(io.StringIO(text), chunk_size=chunk_size)]
+
+    # The 'HSN-' label must be seen even when a chunk boundary splits it from the code
+    whole = spans(len(text))
+    assert whole[:2] == [('0101', 65, 69), ('01011010', 75, 83)]
+    for chunk_size in range(1, 120):
+        assert spans(chunk_size) == whole, chunk_size
+
+
+def test_stream_matches_equal_finditer_at_every_chunk_boundary():
+    # Random runs of digits, separators, letters and labels put every kind of token across boundaries
+    rng = random.Random(9)
+    pieces = ['0101', '01011010', '0101.10.10', '0101 10', '1234567890', 'HSN-', 'hsn', 'INV', 'kg',
+              ' ', '  ', '.', ',', '-', '/', '+', '\n', 'x', '9']
+    text = ''.join(rng.choice(pieces) for _ in range(3000))
+    expected = [(m.group(), m.start(), m.end()) for m in CANDIDATE_PATTERN.finditer(text)]
+    assert len(expected) > 100
+
+    for chunk_size in list(range(1, 64)) + [100, 997, 4096, len(text)]:
+        assert list(iter_stream_matches(io.StringIO(text), CANDIDATE_PATTERN, chunk_size)) == expected, chunk_size
@@ -0,0 +1,44 @@
+import pytest
+
+
+def codes(records):
+    return [record['hsn_code'] for record in records]
+
+
+@pytest.mark.parametrize('depth', [0, 1, 2, None])
+def test_subtree_depth_bound(loader, depth):
+    subtree = loader.get_subtree('01', depth)
+    if depth == 0:
+        assert subtree == []
+    else:
+        assert all(1 <= record['depth'] <= (depth or 99) for record in subtree)
+    if depth == 1:
+        assert codes(subtree) == codes(loader.get_children('01'))
+
+
+def test_subtree_is_the_same_on_every_backend(catalog_paths):
+    from data_loader import HSNDataLoader
+
+    results = {}
+    for source_type, path in catalog_paths.items():
+        loader = HSNDataLoader(source_type, path)
+        loader.load_data()
+        results[source_type] = [
+            [(record['hsn_code'], record['parent_code'], record['depth']) for record in loader.get_subtree('01', depth)]
+            for depth in (0, 1, 2)
+        ]
+        loader.close()
+
+    expected = results.pop('database')
+    assert expected[0] == []
+    assert len(expected[1]) == 14
+    for source_type, result in results.items():
+        assert result == expected, source_type
+
+
+def test_odd_length_codes_have_even_prefix_parents(loader):
+    # '90121' is under chapter 90 and nowhere else
+    assert codes(loader.get_parents('90121')) == ['90']
+    assert '90121' in codes(loader.get_children('90'))
+    # Codes outside the catalog fall back to their existing step prefixes
+    assert codes(loader.get_parents('01019999')) == ['01', '0101']
@@ -0,0 +1,34 @@
+import threading
+
+from agent import HSNCodeAgent
+
+
+def test_sql_queries_are_counted_per_calling_thread(catalog_paths):
+    agent = HSNCodeAgent('database', catalog_paths['database'], cache_size=0, instrument=True)
+    agent.search_by_description('live horses')
+    per_search = agent.stats()['counters']['search_sql_queries']
+    assert per_search > 0
+    agent.metrics.reset()
+
+    # Other threads run queries while the searches are counted
+    stop = threading.Event()
+
+    def search():
+        while not stop.is_set():
+            agent.loader.search_by_description('meat')
+
+    searchers = [threading.Thread(target=search) for _ in range(4)]
+    for thread in searchers:
+        thread.start()
+    try:
+        for _ in range(200):
+            agent.search_by_description('live horses')
+    finally:
+        stop.set()
+        for thread in searchers:
+            thread.join()
+
+    stats = agent.stats()
+    assert stats['counters']['db_queries'] > stats['counters']['search_sql_queries']
+    assert stats['counters']['search_sql_queries'] == 200 * per_search
+    agent.close()
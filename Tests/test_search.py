@@ -0,0 +1,22 @@
+from data_loader import HSNDataLoader
+
+
+def test_fuzzy_index_is_built_while_loading(catalog_paths):
+    lazy = HSNDataLoader('json', catalog_paths['json'])
+    eager = HSNDataLoader('json', catalog_paths['json'], fuzzy=True)
+    assert lazy.load_data() and eager.load_data()
+    assert lazy.fuzzy_index is None
+    assert eager.fuzzy_index is not None
+    assert eager.fuzzy_search('hores', 5) == lazy.fuzzy_search('hores', 5)
+    lazy.close()
+    eager.close()
+
+
+def test_agent_reload_keeps_the_fuzzy_index(catalog_paths):
+    from agent import HSNCodeAgent
+
+    agent = HSNCodeAgent('snapshot', catalog_paths['snapshot'], fuzzy=True)
+    assert agent.loader.fuzzy_index is not None
+    assert agent.reload()
+    assert agent.loader.fuzzy_index is not None
+    agent.close()
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from agent import HSNCodeAgent
+from conftest import CATALOG_CSV
+from server import HSNServer
+
+
+def test_stop_closes_idle_connections_without_waiting():
+    async def scenario():
+        agent = HSNCodeAgent('csv', CATALOG_CSV)
+        server = HSNServer(agent, port=0)
+        port = (await server.start()).sockets[0].getsockname()[1]
+
+        # A keep-alive client that stays connected after its request
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        await reader.readuntil(b'{"status": "ok"}')
+
+        started = time.perf_counter()
+        await server.stop(grace_period=5.0)
+        elapsed = time.perf_counter() - started
+
+        closed = await reader.read()
+        writer.close()
+        agent.close()
+        return elapsed, closed
+
+    elapsed, closed = asyncio.run(scenario())
+    assert elapsed < 1.0
+    assert closed == b''
+
+
+def test_stop_lets_in_flight_requests_finish():
+    async def scenario():
+        agent = HSNCodeAgent('csv', CATALOG_CSV)
+        server = HSNServer(agent, port=0)
+        port = (await server.start()).sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = b'{"descriptions": [' + b', '.join([b'"live horses"'] * 3000) + b']}'
+        writer.write(b"POST /classify HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        await asyncio.sleep(0.05)
+
+        await server.stop(grace_period=30.0)
+        response = await reader.read()
+        writer.close()
+        agent.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.startswith(b'HTTP/1.1 200 OK')
+    assert b'Connection: close' in response
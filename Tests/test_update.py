@@ -0,0 +1,60 @@
+import random
+
+from conftest import CATALOG_CSV
+from database import HSNDatabase, iter_csv_records
+
+QUERIES = ('live horses', 'meat', 'fresh or chilled', 'tariff amendment', 'other')
+
+
+def snapshot(db):
+    """
+    Everything an update must leave the same as a fresh load of the same catalog.
+    """
+    cursor = db.cursor
+    return {
+        'codes': cursor.execute("SELECT hsn_code, description, parent_code, level FROM hsn_codes "
+                                "ORDER BY hsn_code").fetchall(),
+        'closure': cursor.execute("SELECT ancestor, descendant, depth FROM hsn_closure "
+                                  "ORDER BY ancestor, descendant").fetchall(),
+        'search': {query: [record.hsn_code for record in db.search_by_description(query, 20)]
+                   for query in QUERIES}
+    }
+
+
+def amended_catalog(records):
+    rng = random.Random(21)
+    catalog = dict(records)
+    codes = sorted(catalog)
+    for code in rng.sample(codes, 40):
+        del catalog[code]
+    for code in rng.sample(sorted(catalog), 40):
+        catalog[code] += ' (TARIFF AMENDMENT)'
+    # A deleted heading whose subheadings stay, and a new chapter with its own subtree
+    catalog.pop('0101', None)
+    catalog.update({'98': 'NEW CHAPTER', '9801': 'NEW HEADING', '980110': 'NEW SUBHEADING MEAT',
+                    '01011090': 'OTHER LIVE HORSES'})
+    return list(catalog.items())
+
+
+def test_update_matches_a_fresh_load(tmp_path):
+    records = list(iter_csv_records(CATALOG_CSV))
+    amended = amended_catalog(records)
+
+    updated = HSNDatabase(str(tmp_path / "updated.db"))
+    updated.bulk_load(records)
+    summary = updated.apply_update(amended)
+    assert summary['inserted'] and summary['updated'] and summary['deleted']
+    assert summary['version'] == 2
+
+    fresh = HSNDatabase(str(tmp_path / "fresh.db"))
+    fresh.bulk_load(amended)
+
+    assert snapshot(updated) == snapshot(fresh)
+    updated.cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts) VALUES('integrity-check')")
+    changes = updated.cursor.execute("SELECT COUNT(*) FROM hsn_changelog WHERE version = 2").fetchone()[0]
+    assert changes == summary['inserted'] + summary['updated'] + summary['deleted']
+
+    # Applying the same catalog again changes nothing
+    assert updated.apply_update(amended)['version'] == 2
+    updated.close()
+    fresh.close()
@@ -1,21 +1,215 @@
 import re
+import threading
+import time
 from data_loader import HSNDataLoader
+from cache import LRUCache
+from metrics import Metrics
+from extraction import CANDIDATE_PATTERN, STREAM_LOOKBEHIND, STREAM_OVERLAP
+
 
 class HSNCodeAgent:
     """
     HSN Code Validation Agent for validating and searching HSN codes.
+    
+    An agent can be shared across threads: the database source uses
+    per-thread read-only connections, and the result cache is locked.
     """
     
-    def __init__(self, data_source="database", source_path=None):
+    def __init__(self, data_source="database", source_path=None, cache_size=4096, cache_ttl=None,
+                 version_check_interval=1.0, instrument=False, suggestions=3, reload_grace_period=30.0,
+                 fuzzy=False):
         """
         Initialize the HSN Code Agent.
         
+        Validation and search results are kept in a bounded LRU cache. The
+        cache is tied to the version of the data source. When the source
+        changes, a fresh catalog is loaded in a background thread and
+        swapped in atomically once it is complete: requests keep being
+        answered from the previous catalog meanwhile, and never see a
+        partially loaded one. Cached results are shared, so callers should
+        treat them as read-only.
+        
         Args:
-            data_source (str): Type of data source ('database', 'csv', 'json')
+            data_source (str): Type of data source ('database', 'csv', 'json', 'snapshot')
             source_path (str): Path to the data source
+            cache_size (int): Maximum number of cached results. 0 disables caching
+            cache_ttl (float): Seconds a cached result stays valid. If None, results never expire
+            version_check_interval (float): Minimum seconds between data source version checks
+            instrument (bool): Collect call counts, latencies and query counts (see stats())
+            suggestions (int): Number of nearest valid codes suggested for unknown codes. 0 disables
+            reload_grace_period (float): Seconds a replaced catalog stays open for requests still using it
+            fuzzy (bool): Build the fuzzy search index while loading instead of on the first fuzzy search
+        """
+        self.suggestions = suggestions
+        self.metrics = Metrics() if instrument else None
+        loader = HSNDataLoader(data_source, source_path, fuzzy=fuzzy)
+        loader.metrics = self.metrics
+        start = time.perf_counter()
+        loader.load_data()
+        if self.metrics is not None:
+            self.metrics.observe('load', time.perf_counter() - start)
+        
+        # The loader and the version it was loaded at are swapped together as one tuple
+        self._catalog = (loader, loader.dataset_version())
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self.version_check_interval = version_check_interval
+        self.reload_grace_period = reload_grace_period
+        self._next_version_check = time.monotonic() + version_check_interval
+        self._reload_lock = threading.Lock()
+        self._reload_thread = None
+        self._retired = []
+    
+    @property
+    def loader(self):
+        """
+        The loader of the catalog currently serving requests.
+        """
+        return self._catalog[0]
+    
+    @property
+    def dataset_version(self):
         """
-        self.loader = HSNDataLoader(data_source, source_path)
-        self.loader.load_data()
+        The version token of the catalog currently serving requests.
+        """
+        return self._catalog[1]
+    
+    def _check_dataset_version(self):
+        """
+        Start a background reload if the data source has changed.
+        """
+        now = time.monotonic()
+        if now < self._next_version_check:
+            return
+        self._next_version_check = now + self.version_check_interval
+        self._close_retired(now)
+        
+        loader, version = self._catalog
+        latest = loader.dataset_version()
+        # A missing file (e.g. mid-replace) keeps the current catalog
+        if latest is not None and latest != version:
+            with self._reload_lock:
+                if self._reload_thread is None or not self._reload_thread.is_alive():
+                    self._reload_thread = threading.Thread(target=self.reload, name="hsn-reload", daemon=True)
+                    self._reload_thread.start()
+    
+    def reload(self):
+        """
+        Load the catalog again from the data source and swap it in.
+        
+        The new catalog, including any search indexes the current one has
+        built, is fully loaded before it replaces the current one in a
+        single assignment. The replaced catalog is closed after the reload
+        grace period. Called from a background thread when the source
+        changes, or directly to force a reload.
+        
+        Returns:
+            bool: True if the new catalog was swapped in, False if it failed to load
+        """
+        current = self.loader
+        # Read the version first, so a change made during the load triggers another reload
+        version = current.dataset_version()
+        start = time.perf_counter()
+        
+        loader = HSNDataLoader(current.source_type, current.source_path, fuzzy=current.fuzzy)
+        loader.metrics = self.metrics
+        if not loader.load_data():
+            loader.close()
+            if self.metrics is not None:
+                self.metrics.increment('reload_failures')
+            return False
+        loader.warm_from(current)
+        
+        with self._reload_lock:
+            retired = self.loader
+            self._catalog = (loader, version)
+            self._retired.append((retired, time.monotonic() + self.reload_grace_period))
+        # Entries are keyed by version, so this only frees memory
+        self.cache.clear()
+        
+        if self.metrics is not None:
+            self.metrics.increment('reloads')
+            self.metrics.observe('reload', time.perf_counter() - start)
+        return True
+    
+    def _close_retired(self, now=None):
+        """
+        Close replaced catalogs whose grace period has passed (all of them if now is None).
+        """
+        if not self._retired:
+            return
+        with self._reload_lock:
+            expired = [loader for loader, deadline in self._retired if now is None or deadline <= now]
+            self._retired = [(loader, deadline) for loader, deadline in self._retired
+                             if now is not None and deadline > now]
+        for loader in expired:
+            loader.close()
+    
+    def cache_stats(self):
+        """
+        Get result cache statistics.
+        
+        Returns:
+            dict: Cache size, hit/miss/eviction counters and the dataset version
+        """
+        stats = self.cache.stats()
+        stats['dataset_version'] = self.dataset_version
+        return stats
+    
+    def stats(self):
+        """
+        Get instrumentation statistics.
+        
+        Includes per-operation call counts and latency summaries, SQL queries
+        and rows fetched, and cache and index hit rates. Operation metrics are
+        only collected when the agent was created with instrument=True.
+        
+        Returns:
+            dict: Statistics snapshot
+        """
+        stats = {'cache': self.cache_stats(), 'instrumented': self.metrics is not None}
+        if self.metrics is None:
+            return stats
+        
+        stats.update(self.metrics.stats())
+        counters = stats['counters']
+        validations = counters.get('validate_calls', 0)
+        index_lookups = counters.get('index_hits', 0) + counters.get('index_misses', 0)
+        stats['sql_queries_per_validation'] = counters.get('validate_sql_queries', 0) / validations if validations else 0.0
+        stats['index_hit_rate'] = counters.get('index_hits', 0) / index_lookups if index_lookups else 0.0
+        return stats
+    
+    def metrics_text(self):
+        """
+        Export instrumentation metrics in the Prometheus text format.
+        
+        Returns:
+            str: Metrics in Prometheus text format
+        """
+        cache = self.cache.stats()
+        gauges = {
+            'cache_size': cache['size'],
+            'cache_hits': cache['hits'],
+            'cache_misses': cache['misses'],
+            'cache_evictions': cache['evictions']
+        }
+        if self.metrics is None:
+            return Metrics().to_prometheus(gauges=gauges)
+        return self.metrics.to_prometheus(gauges=gauges)
+    
+    def _instrumented(self, name, func, *args):
+        """
+        Call func, recording its latency and the SQL queries it issued.
+        """
+        metrics = self.metrics
+        # Queries are counted per thread, so concurrent calls are not attributed to this one
+        queries = metrics.thread_total('db_queries')
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            metrics.observe(name, time.perf_counter() - start)
+            metrics.increment(f'{name}_calls')
+            metrics.increment(f'{name}_sql_queries', metrics.thread_total('db_queries') - queries)
     
     def validate_hsn_code(self, hsn_code):
         """
@@ -30,6 +224,27 @@ class HSNCodeAgent:
         # Clean the input
         hsn_code = str(hsn_code).strip()
         
+        self._check_dataset_version()
+        if self.metrics is not None:
+            return self._instrumented('validate', self._validate_cached, hsn_code)
+        return self._validate_cached(hsn_code)
+    
+    def _validate_cached(self, hsn_code):
+        """
+        Validate a cleaned HSN code, using the result cache.
+        """
+        loader, version = self._catalog
+        key = ('validate', version, hsn_code)
+        result = self.cache.get(key)
+        if result is LRUCache.MISSING:
+            result = self._validate(loader, hsn_code)
+            self.cache.put(key, result)
+        return result
+    
+    def _validate(self, loader, hsn_code):
+        """
+        Validate a cleaned HSN code against one loaded catalog.
+        """
         # Check if the code format is valid (2-8 digits)
         if not re.match(r'^\d{2,8}$', hsn_code):
             return {
@@ -38,77 +253,337 @@ class HSNCodeAgent:
                 'code': hsn_code
             }
         
-        # Check if the code exists in the database
-        if self.loader.is_valid_hsn_code(hsn_code):
-            # Get details for the code
-            results = self.loader.search_by_code(hsn_code)
+        # Look up the code in the in-memory index
+        details = loader.get_code_details(hsn_code)
+        if self.metrics is not None:
+            self.metrics.increment('index_hits' if details is not None else 'index_misses')
+        if details is not None:
             return {
                 'valid': True,
                 'code': hsn_code,
-                'details': results[0] if results else None
+                'details': details
             }
         
         # If not found, try to find parent codes
-        parent_codes = []
-        for i in range(2, len(hsn_code), 2):
-            parent_code = hsn_code[:i]
-            if self.loader.is_valid_hsn_code(parent_code):
-                results = self.loader.search_by_code(parent_code)
-                if results:
-                    parent_codes.append(results[0])
+        parent_codes = loader.get_parent_codes(hsn_code)
+        if self.metrics is not None:
+            self.metrics.increment('parent_lookups', (len(hsn_code) - 1) // 2)
         
         if parent_codes:
-            return {
+            result = {
                 'valid': False,
                 'reason': 'Specific HSN code not found, but parent categories exist.',
                 'code': hsn_code,
                 'parent_codes': parent_codes
             }
+        else:
+            result = {
+                'valid': False,
+                'reason': 'HSN code not found in the database.',
+                'code': hsn_code
+            }
         
-        return {
-            'valid': False,
-            'reason': 'HSN code not found in the database.',
-            'code': hsn_code
-        }
+        # Suggest the nearest valid codes for mistyped or transposed digits
+        if self.suggestions:
+            suggestions = loader.suggest_codes(hsn_code, self.suggestions)
+            if suggestions:
+                result['suggestions'] = suggestions
+        
+        return result
+    
+    def validate_many(self, hsn_codes, chunk_size=10000):
+        """
+        Validate a stream of HSN codes.
+        
+        Codes are consumed in chunks so memory stays bounded for arbitrarily
+        long inputs. Repeated codes within a chunk are resolved only once.
+        
+        Args:
+            hsn_codes (iterable): HSN codes to validate
+            chunk_size (int): Number of codes to resolve at a time
+        
+        Yields:
+            dict: Validation result for each input code, in input order
+        """
+        chunk = []
+        for hsn_code in hsn_codes:
+            chunk.append(str(hsn_code).strip())
+            if len(chunk) >= chunk_size:
+                yield from self._validate_chunk(chunk)
+                chunk = []
+        
+        if chunk:
+            yield from self._validate_chunk(chunk)
+    
+    def _validate_chunk(self, chunk):
+        """
+        Validate a chunk of codes, resolving each distinct code once.
+        """
+        resolved = {hsn_code: self.validate_hsn_code(hsn_code) for hsn_code in set(chunk)}
+        return (resolved[hsn_code] for hsn_code in chunk)
     
-    def search_by_description(self, description):
+    def search_by_description(self, description, limit=None, offset=0, fuzzy=False):
         """
         Search for HSN codes by description.
         
+        Every word in the description must match; a trailing '*' makes a
+        word a prefix match (e.g. 'live hors*'). Results are ranked by
+        relevance. With fuzzy=True, misspelled words (e.g. 'hores') are
+        matched by trigram similarity instead, and the top results are
+        returned with a similarity 'score'.
+        
         Args:
             description (str): Description to search for
+            limit (int): Maximum number of results. If None, all results are
+                returned (10 for fuzzy searches)
+            offset (int): Number of results to skip
+            fuzzy (bool): Use typo-tolerant trigram search
         
         Returns:
-            list: List of matching records
+            list: List of matching records, best match first
+        """
+        self._check_dataset_version()
+        if self.metrics is not None:
+            return self._instrumented('fuzzy_search' if fuzzy else 'search', self._search_cached,
+                                      description, limit, offset, fuzzy)
+        return self._search_cached(description, limit, offset, fuzzy)
+    
+    def _search_cached(self, description, limit, offset, fuzzy=False):
+        """
+        Search descriptions, using the result cache.
+        """
+        loader, version = self._catalog
+        key = ('search', version, description, limit, offset, fuzzy)
+        results = self.cache.get(key)
+        if results is LRUCache.MISSING:
+            if fuzzy:
+                top_k = offset + (limit if limit is not None else 10)
+                results = loader.fuzzy_search(description, top_k)[offset:]
+            else:
+                results = loader.search_by_description(description, limit, offset)
+            self.cache.put(key, results)
+        return results
+    
+    def classify_many(self, descriptions, top_k=5, chunk_size=10000):
+        """
+        Map free-text product descriptions to ranked candidate HSN codes.
+        
+        Descriptions are consumed in chunks so memory stays bounded for
+        arbitrarily long inputs. Each chunk is scored in one pass against a
+        TF-IDF matrix of the catalog descriptions that is built once.
+        
+        Args:
+            descriptions (iterable): Free-text descriptions
+            top_k (int): Number of candidate codes per description
+            chunk_size (int): Number of descriptions scored at a time
+        
+        Yields:
+            dict: 'description' and its 'candidates' (records with a 'score'
+                  between 0 and 1, best match first), in input order
         """
-        return self.loader.search_by_description(description)
+        chunk = []
+        for description in descriptions:
+            chunk.append(str(description))
+            if len(chunk) >= chunk_size:
+                yield from self._classify_chunk(chunk, top_k)
+                chunk = []
+        
+        if chunk:
+            yield from self._classify_chunk(chunk, top_k)
+    
+    def _classify_chunk(self, chunk, top_k):
+        """
+        Classify one chunk of descriptions against the current catalog.
+        """
+        self._check_dataset_version()
+        loader = self.loader
+        if self.metrics is not None:
+            self.metrics.increment('classify_descriptions', len(chunk))
+            ranked = self._instrumented('classify', loader.classify_many, chunk, top_k)
+        else:
+            ranked = loader.classify_many(chunk, top_k)
+        return ({'description': description, 'candidates': candidates}
+                for description, candidates in zip(chunk, ranked))
+    
+    def get_parents(self, hsn_code):
+        """
+        Get the ancestors of an HSN code, broadest first.
+        
+        Args:
+            hsn_code (str): HSN code to get the ancestors of
+        
+        Returns:
+            list: List of ancestor records
+        """
+        return self._hierarchy_lookup('get_parents', str(hsn_code).strip())
+    
+    def get_children(self, hsn_code=None):
+        """
+        Get the direct children of an HSN code.
+        
+        Args:
+            hsn_code (str): Parent HSN code. None for the top-level codes
+        
+        Returns:
+            list: List of child records ordered by code
+        """
+        if hsn_code is not None:
+            hsn_code = str(hsn_code).strip()
+        return self._hierarchy_lookup('get_children', hsn_code)
+    
+    def get_subtree(self, hsn_code, depth=None):
+        """
+        Get the descendants of an HSN code, e.g. for a tree browser.
+        
+        Args:
+            hsn_code (str): Root of the subtree
+            depth (int): Maximum number of levels below the root. If None, all levels
+        
+        Returns:
+            list: Records with 'parent_code' and 'depth' below the root, ordered by code
+        """
+        return self._hierarchy_lookup('get_subtree', str(hsn_code).strip(), depth)
+    
+    def _hierarchy_lookup(self, name, *args):
+        """
+        Run a hierarchy query of the current catalog's loader.
+        """
+        self._check_dataset_version()
+        func = getattr(self.loader, name)
+        if self.metrics is not None:
+            return self._instrumented(name, func, *args)
+        return func(*args)
     
     def extract_hsn_codes(self, text):
         """
         Extract potential HSN codes from text.
         
+        Bare codes and dotted or spaced forms (0101.10.10, 8542 31 00) are
+        recognized. Numbers that cannot be HSN codes are rejected against
+        the catalog before any validation; codes under a known heading that
+        are not in the catalog are still reported, as invalid.
+        
         Args:
             text (str): Text to extract HSN codes from
         
         Returns:
             list: List of extracted HSN codes with validation status
         """
-        # Pattern for potential HSN codes (2-8 digits)
-        pattern = r'\b\d{2,8}\b'
-        
-        # Find all matches
-        matches = re.findall(pattern, text)
-        
-        # Validate each match
+        if self.metrics is not None:
+            return self._instrumented('extract', self._extract, text)
+        return self._extract(text)
+    
+    def _extract(self, text):
+        """
+        Extract and validate candidates from text.
+        """
+        # Resolve and validate each distinct candidate only once
+        resolved = {}
         results = []
-        for match in matches:
-            validation = self.validate_hsn_code(match)
-            results.append(validation)
+        for token in CANDIDATE_PATTERN.findall(text):
+            if token not in resolved:
+                resolved[token] = self._resolve_candidate(token)
+            if resolved[token] is not None:
+                results.append(resolved[token][0])
         
         return results
     
+    def _resolve_candidate(self, token):
+        """
+        Validate the code a candidate stands for.
+        
+        Returns:
+            tuple: (validation result, number of token characters the code spans), or None for non-codes
+        """
+        resolved = self.loader.resolve_code_candidate(token)
+        if self.metrics is not None:
+            self.metrics.increment('extract_candidates')
+            if resolved is None:
+                self.metrics.increment('extract_rejected')
+        if resolved is None:
+            return None
+        hsn_code, length = resolved
+        return self.validate_hsn_code(hsn_code), length
+    
+    def extract_hsn_codes_stream(self, stream, chunk_size=1 << 20, max_distinct=100000):
+        """
+        Extract potential HSN codes from a text stream, chunk by chunk.
+        
+        Codes that span chunk boundaries are handled correctly, and each
+        distinct candidate is resolved and validated only once (up to
+        max_distinct remembered candidates).
+        
+        Args:
+            stream (file): Text stream to read from
+            chunk_size (int): Number of characters read at a time
+            max_distinct (int): Maximum number of validations remembered
+        
+        Yields:
+            dict: Validation result with 'start' and 'end' character offsets
+        """
+        resolved = {}
+        for token, start, _ in iter_stream_matches(stream, CANDIDATE_PATTERN, chunk_size):
+            if token not in resolved:
+                if len(resolved) >= max_distinct:
+                    resolved.clear()
+                resolved[token] = self._resolve_candidate(token)
+            if resolved[token] is not None:
+                validation, length = resolved[token]
+                yield dict(validation, start=start, end=start + length)
+    
     def close(self):
         """
-        Close any open connections.
+        Close any open connections, including those of replaced catalogs.
         """
-        self.loader.close()
\ No newline at end of file
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join()
+        self._close_retired()
+        self.loader.close()
+
+
+def iter_stream_matches(stream, pattern, chunk_size=1 << 20, overlap=STREAM_OVERLAP, lookbehind=STREAM_LOOKBEHIND):
+    """
+    Find pattern matches in a text stream without reading it all into memory.
+    
+    The tail of each chunk is held back and scanned again with the next
+    chunk, so matches that span a chunk boundary are found exactly once and
+    with the same boundaries as a scan over the whole text. The overlap
+    must be longer than any match.
+    
+    Args:
+        stream (file): Text stream to read from
+        pattern (re.Pattern): Compiled pattern to search for
+        chunk_size (int): Number of characters read at a time
+        overlap (int): Number of characters held back at the end of a chunk
+        lookbehind (int): Number of characters the pattern looks behind a match
+    
+    Yields:
+        tuple: (matched text, start offset, end offset) in stream characters
+    """
+    buffer = ''
+    base = 0
+    pos = 0
+    while True:
+        chunk = stream.read(max(chunk_size, 1))
+        at_eof = not chunk
+        buffer += chunk
+        
+        # Matches ending inside the held-back tail may still grow with the next chunk
+        cut = len(buffer) if at_eof else len(buffer) - overlap
+        resume = cut
+        for m in pattern.finditer(buffer, pos):
+            if not at_eof and m.end() >= cut:
+                resume = m.start()
+                break
+            yield m.group(), base + m.start(), base + m.end()
+        
+        if at_eof:
+            return
+        
+        # Keep the characters before the resume point so boundaries still see their context
+        resume = max(pos, min(resume, cut))
+        keep_from = max(resume - lookbehind, 0)
+        buffer = buffer[keep_from:]
+        base += keep_from
+        pos = resume - keep_from
\ No newline at end of file
@@ -0,0 +1,129 @@
+import sys
+import numpy as np
+from records import HSNRecord, strings_size
+
+class HSNArrayIndex:
+    """
+    Columnar index of HSN codes backed by NumPy arrays.
+    Codes are kept as a sorted string array so prefix ranges come from two
+    binary searches (searchsorted), and an exact-match hash maps each code
+    to its row for O(1) lookups. Provides the same lookup interface as
+    HSNCodeIndex.
+    """
+
+    def __init__(self, codes, descriptions):
+        """
+        Build the index.
+
+        Args:
+            codes (iterable): HSN codes, as strings
+            descriptions (iterable): Descriptions, in the same order as the codes
+        """
+        codes = np.char.strip(np.asarray(codes, dtype=str))
+        # Interned, so a description shared by several codes is stored once
+        descriptions = np.asarray([sys.intern(str(description).strip()) for description in descriptions], dtype=object)
+
+        # np.unique sorts the codes; searching the reversed array keeps the
+        # last occurrence of a duplicated code, as HSNCodeIndex does
+        self.codes, first = np.unique(codes[::-1], return_index=True)
+        self.descriptions = descriptions[len(codes) - 1 - first]
+        self.positions = {code: position for position, code in enumerate(self.codes.tolist())}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, hsn_code):
+        return hsn_code in self.positions
+
+    def _record(self, position):
+        return HSNRecord(str(self.codes[position]), self.descriptions[position])
+
+    def get(self, hsn_code):
+        """
+        Get the record for an exact HSN code.
+
+        Args:
+            hsn_code (str): HSN code to look up
+
+        Returns:
+            HSNRecord: Matching record, or None if the code does not exist
+        """
+        position = self.positions.get(hsn_code)
+        if position is None:
+            return None
+        return self._record(position)
+
+    def existing_codes(self, codes):
+        """
+        Get which of many candidate codes are in the index.
+
+        Args:
+            codes (list): Candidate codes
+
+        Returns:
+            list: The candidates present in the index, in input order
+        """
+        positions = self.positions
+        return [code for code in codes if code in positions]
+
+    def parents(self, hsn_code):
+        """
+        Get the existing parent records of an HSN code, broadest first.
+
+        Args:
+            hsn_code (str): HSN code to get the parents of
+
+        Returns:
+            list: List of parent records
+        """
+        parents = []
+        for i in range(2, len(hsn_code), 2):
+            position = self.positions.get(hsn_code[:i])
+            if position is not None:
+                parents.append(self._record(position))
+        return parents
+
+    def iter_records(self):
+        """
+        Iterate over all records in code order.
+
+        Yields:
+            HSNRecord: Record with 'hsn_code' and 'description'
+        """
+        for hsn_code, description in zip(self.codes.tolist(), self.descriptions):
+            yield HSNRecord(hsn_code, description)
+
+    def prefix_search(self, prefix):
+        """
+        Get all records whose code starts with the given prefix.
+
+        Args:
+            prefix (str): Code prefix to search for
+
+        Returns:
+            list: List of matching records ordered by code
+        """
+        start = int(np.searchsorted(self.codes, prefix, side='left'))
+        end = int(np.searchsorted(self.codes, prefix + '\uffff', side='left'))
+        return [HSNRecord(hsn_code, description)
+                for hsn_code, description in zip(self.codes[start:end].tolist(), self.descriptions[start:end])]
+
+    def memory_usage(self):
+        """
+        Measure the memory held by the index. Records are created on access,
+        so only the arrays, the exact-match hash and the strings count.
+
+        Returns:
+            dict: Number of records, total bytes, and bytes and count of the distinct descriptions
+        """
+        description_bytes, unique_descriptions = strings_size(self.descriptions)
+        total = (self.codes.nbytes + self.descriptions.nbytes + sys.getsizeof(self.positions)
+                 + strings_size(self.positions)[0]
+                 + sum(sys.getsizeof(position) for position in self.positions.values())
+                 + description_bytes)
+        return {
+            'records': len(self.positions),
+            'bytes': total,
+            'description_bytes': description_bytes,
+            'unique_descriptions': unique_descriptions
+        }
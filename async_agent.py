@@ -0,0 +1,128 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from agent import HSNCodeAgent
+
+class AsyncHSNCodeAgent:
+    """
+    asyncio wrapper around HSNCodeAgent.
+
+    Blocking backend work runs on a bounded thread pool so the event loop is
+    never stalled by SQLite queries or pandas scans. Concurrent identical
+    requests that are still in flight share one backend call. Results have
+    the same shapes as HSNCodeAgent's.
+
+    Usage:
+        agent = await AsyncHSNCodeAgent.create()
+        result = await agent.validate("01011010")
+        await agent.close()
+    """
+
+    def __init__(self, data_source="database", source_path=None, max_workers=4, **agent_options):
+        """
+        Initialize the agent. This loads the data synchronously; use create()
+        from inside a running event loop to load it on the executor instead.
+
+        Args:
+            data_source (str): Type of data source ('database', 'csv', 'json', 'snapshot')
+            source_path (str): Path to the data source
+            max_workers (int): Maximum number of threads running backend work
+            **agent_options: Extra options passed to HSNCodeAgent (cache_size, instrument, ...)
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hsn-agent")
+        self.agent = HSNCodeAgent(data_source, source_path, **agent_options)
+        self._inflight = {}
+
+    @classmethod
+    async def create(cls, data_source="database", source_path=None, max_workers=4, **agent_options):
+        """
+        Create an agent without blocking the event loop while the data loads.
+
+        Returns:
+            AsyncHSNCodeAgent: Ready-to-use agent
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: cls(data_source, source_path, max_workers, **agent_options))
+
+    async def _run(self, key, func, *args):
+        """
+        Run func on the executor, sharing the call with identical in-flight requests.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def validate(self, hsn_code):
+        """
+        Validate an HSN code.
+
+        Args:
+            hsn_code (str): HSN code to validate
+
+        Returns:
+            dict: Validation result with status and details
+        """
+        hsn_code = str(hsn_code).strip()
+        return await self._run(('validate', hsn_code), self.agent.validate_hsn_code, hsn_code)
+
+    async def validate_many(self, hsn_codes):
+        """
+        Validate a batch of HSN codes in a single executor call.
+
+        Args:
+            hsn_codes (iterable): HSN codes to validate
+
+        Returns:
+            list: Validation results in input order
+        """
+        hsn_codes = [str(hsn_code).strip() for hsn_code in hsn_codes]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: list(self.agent.validate_many(hsn_codes)))
+
+    async def search_by_description(self, description, limit=None, offset=0, fuzzy=False):
+        """
+        Search for HSN codes by description.
+
+        Args:
+            description (str): Description to search for
+            limit (int): Maximum number of results. If None, all results are returned
+            offset (int): Number of results to skip
+            fuzzy (bool): Use typo-tolerant trigram search
+
+        Returns:
+            list: List of matching records, best match first
+        """
+        return await self._run(('search', description, limit, offset, fuzzy),
+                               self.agent.search_by_description, description, limit, offset, fuzzy)
+
+    async def extract(self, text):
+        """
+        Extract and validate potential HSN codes from text.
+
+        Args:
+            text (str): Text to extract HSN codes from
+
+        Returns:
+            list: List of extracted HSN codes with validation status
+        """
+        return await self._run(('extract', text), self.agent.extract_hsn_codes, text)
+
+    async def close(self):
+        """
+        Wait for pending work, then close the agent and its executor.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown, True)
+        self.agent.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
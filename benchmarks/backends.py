@@ -0,0 +1,260 @@
+"""
+Benchmark suite for the HSNDataLoader backends.
+
+Measures validate_hsn_code, search_by_code, search_by_description and
+extract_hsn_codes on the database, csv, json and snapshot sources, on the
+real cleaned catalog and on synthetic catalogs of any size. Every
+(catalog, backend) pair runs in its own process so peak memory is measured
+in isolation. Each operation is called once before it is timed, so the
+one-time work done on first use (description and trigram indexes, lazy
+imports) is reported with the load time instead of inflating the
+latency percentiles. Reports load and warm-up time, latency
+percentiles, throughput and peak RSS, and saves machine-readable JSON
+results for comparing runs.
+
+Usage:
+    python benchmarks/backends.py --sizes real 100000 1000000 --output results.json
+    python benchmarks/backends.py --sizes 100000 --backends database snapshot --queries 5000
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+BACKENDS = ["database", "csv", "json", "snapshot"]
+REAL_CATALOG = os.path.join(ROOT_DIR, "Tests", "HSN_codes_cleaned.csv")
+
+def percentile(values, fraction):
+    """
+    Get a percentile from a list of values using nearest-rank.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def peak_rss_mb():
+    """
+    Get the peak resident set size of this process in MB, if available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def build_sources(csv_path, workdir):
+    """
+    Build database, JSON and snapshot sources from a cleaned CSV catalog.
+
+    Returns:
+        dict: Source path for each backend
+    """
+    from database import HSNDatabase, iter_csv_records
+    from snapshot import compile_snapshot
+    from json_catalog import export_json
+
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    paths = {
+        "csv": csv_path,
+        "database": os.path.join(workdir, f"{name}.db"),
+        "json": os.path.join(workdir, f"{name}.json"),
+        "snapshot": os.path.join(workdir, f"{name}.snap")
+    }
+
+    if os.path.exists(paths["database"]):
+        os.remove(paths["database"])
+    db = HSNDatabase(paths["database"])
+    db.create_tables()
+    db.load_data_from_csv(csv_path)
+    db.close()
+
+    export_json(iter_csv_records(csv_path), paths["json"])
+
+    compile_snapshot(iter_csv_records(csv_path), paths["snapshot"])
+    return paths
+
+def make_workload(csv_path, queries, seed=7):
+    """
+    Build a reproducible query workload from a catalog.
+
+    Validation codes are a mix of existing codes, unknown codes under an
+    existing parent, and unknown or malformed codes.
+
+    Returns:
+        dict: Inputs for each benchmarked operation
+    """
+    from database import iter_csv_records
+
+    rng = random.Random(seed)
+    records = list(iter_csv_records(csv_path))
+    codes = [code for code, _ in records]
+    words = sorted({word for _, description in rng.sample(records, min(len(records), 2000))
+                    for word in description.split() if word.isalpha() and len(word) > 3})
+
+    validate = []
+    for _ in range(queries):
+        roll = rng.random()
+        code = rng.choice(codes)
+        if roll < 0.7:
+            validate.append(code)
+        elif roll < 0.9:
+            validate.append((code + "99999999")[:8][:-2] + "99")
+        else:
+            validate.append(rng.choice(["00", "9999", "12345678", "12a4"]))
+
+    texts = []
+    for _ in range(max(1, queries // 10)):
+        sample = rng.sample(codes, 3)
+        texts.append(f"Invoice {rng.randint(1000, 99999)} dated 2024-{rng.randint(1, 12):02d}-15 lists HSN "
+                     f"{sample[0]} and {sample[1]}; total {rng.randint(100, 99999)}.{rng.randint(0, 99):02d}, "
+                     f"ref {sample[2]}")
+
+    return {
+        "validate_hsn_code": validate,
+        "search_by_code": [rng.choice(codes)[:4] for _ in range(max(1, queries // 10))],
+        "search_by_description": [" ".join(rng.sample(words, min(len(words), rng.randint(1, 2))))
+                                  for _ in range(max(1, queries // 10))],
+        "extract_hsn_codes": texts
+    }
+
+def run_backend(backend, source_path, workload):
+    """
+    Benchmark one backend in the current process.
+
+    Returns:
+        dict: Load time, warm-up time, per-operation latency statistics and peak memory
+    """
+    from agent import HSNCodeAgent
+
+    start = time.perf_counter()
+    # Disable the result cache so the backend itself is measured
+    agent = HSNCodeAgent(backend, source_path, cache_size=0)
+    load_seconds = time.perf_counter() - start
+
+    operations = {
+        "validate_hsn_code": agent.validate_hsn_code,
+        "search_by_code": agent.loader.search_by_code,
+        "search_by_description": lambda query: agent.search_by_description(query, limit=10),
+        "extract_hsn_codes": agent.extract_hsn_codes
+    }
+
+    # First calls build the lazy indexes; time them apart from the steady state
+    warmup = {}
+    for name, operation in operations.items():
+        call_start = time.perf_counter()
+        operation(workload[name][0])
+        warmup[name] = time.perf_counter() - call_start
+
+    results = {
+        "load_seconds": load_seconds,
+        "warmup_seconds": sum(warmup.values()),
+        "records": len(agent.loader.index),
+        "operations": {}
+    }
+    for name, operation in operations.items():
+        inputs = workload[name]
+        latencies = []
+        total_start = time.perf_counter()
+        for item in inputs:
+            call_start = time.perf_counter_ns()
+            operation(item)
+            latencies.append((time.perf_counter_ns() - call_start) / 1000)
+        total = time.perf_counter() - total_start
+        results["operations"][name] = {
+            "first_call_us": warmup[name] * 1e6,
+            "calls": len(inputs),
+            "p50_us": percentile(latencies, 0.50),
+            "p95_us": percentile(latencies, 0.95),
+            "p99_us": percentile(latencies, 0.99),
+            "max_us": max(latencies),
+            "ops_per_second": len(inputs) / total if total > 0 else 0.0
+        }
+
+    agent.close()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+def run_isolated(backend, source_path, csv_path, queries):
+    """
+    Run one backend benchmark in a fresh interpreter and return its results.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--worker", backend, source_path, csv_path, str(queries)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HSNDataLoader backends")
+    parser.add_argument("--sizes", nargs="+", default=["real", "100000"],
+                        help="Catalogs to benchmark: 'real' or a synthetic row count (default: real 100000)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS, help="Backends to benchmark")
+    parser.add_argument("--queries", type=int, default=2000, help="Validation calls per backend (default: 2000)")
+    parser.add_argument("--workdir", help="Directory for generated catalogs (default: a temporary directory)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, source_path, csv_path, queries = args.worker
+        workload = make_workload(csv_path, int(queries))
+        print(json.dumps(run_backend(backend, source_path, workload)))
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="hsn_bench_")
+    os.makedirs(workdir, exist_ok=True)
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "queries": args.queries,
+        "catalogs": {}
+    }
+
+    for size in args.sizes:
+        if size == "real":
+            csv_path = REAL_CATALOG
+        else:
+            from synthetic_catalog import write_catalog_csv
+            csv_path = os.path.join(workdir, f"synthetic_{size}.csv")
+            if not os.path.exists(csv_path):
+                write_catalog_csv(csv_path, int(size))
+
+        print(f"\n=== Catalog: {size} ===")
+        sources = build_sources(csv_path, workdir)
+        catalog = report["catalogs"][size] = {}
+        for backend in args.backends:
+            result = catalog[backend] = run_isolated(backend, sources[backend], csv_path, args.queries)
+            print(f"{backend:<9} records={result['records']} load={result['load_seconds'] * 1000:.1f}ms "
+                  f"warmup={result['warmup_seconds'] * 1000:.1f}ms peak_rss={result['peak_rss_mb'] or 0:.1f}MB")
+            for name, stats in result["operations"].items():
+                print(f"    {name:<22} p50={stats['p50_us']:>9.1f}us p95={stats['p95_us']:>9.1f}us "
+                      f"p99={stats['p99_us']:>9.1f}us  {stats['ops_per_second']:>10.0f} ops/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Cold-start benchmark for the main.py subcommands.
+
+Runs each subcommand in a fresh interpreter several times and reports
+wall-clock latency percentiles, plus the heavy modules (pandas, numpy)
+each command ends up importing. Results can be saved as JSON so start-up
+regressions show up when runs are compared.
+
+Usage:
+    python benchmarks/cold_start.py --runs 20 --output cold_start.json
+    python benchmarks/cold_start.py --source snapshot --source-path hsn_codes.snap
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT_DIR, "main.py")
+HEAVY_MODULES = ["pandas", "numpy"]
+
+COMMANDS = {
+    "help": [],
+    "validate": ["validate", "01011010"],
+    "validate-invalid": ["validate", "01019999"],
+    "search": ["search", "live horses", "--limit", "10"],
+    "extract": ["extract", "Invoice lists HSN 01011010 and 85423100"],
+}
+
+# Reports which heavy modules a command imports, without running it
+IMPORT_PROBE = (
+    "import json, sys, runpy; sys.argv = {argv!r}\n"
+    "try:\n"
+    "    runpy.run_path({main!r}, run_name='__main__')\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "sys.stdout = sys.__stdout__\n"
+    "print('\\n' + json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))\n"
+)
+
+def percentile(values, fraction):
+    """
+    Get a percentile from a list of values using nearest-rank.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def source_args(source, source_path):
+    args = ["--source", source]
+    if source_path:
+        args += ["--source-path", source_path]
+    return args
+
+def time_command(argv, runs):
+    """
+    Run a command in fresh interpreters and collect wall-clock timings.
+
+    Returns:
+        list: Timings in milliseconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN] + argv, cwd=ROOT_DIR,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def heavy_imports(argv):
+    """
+    Find which heavy modules a command imports.
+
+    Returns:
+        list: Names of heavy modules present after the command ran
+    """
+    code = IMPORT_PROBE.format(argv=[MAIN] + argv, main=MAIN, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for main.py subcommands")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command (default: 10)")
+    parser.add_argument("--source", default="database", help="Data source passed to main.py (default: database)")
+    parser.add_argument("--source-path", help="Path to the data source")
+    parser.add_argument("--commands", nargs="+", choices=sorted(COMMANDS), help="Commands to benchmark (default: all)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Baseline: bare interpreter start-up
+    baseline = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append((time.perf_counter() - start) * 1000)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": args.source,
+        "runs": args.runs,
+        "interpreter_ms": statistics.median(baseline),
+        "commands": {}
+    }
+
+    print(f"{'command':<18} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}  heavy imports")
+    print(f"{'(interpreter)':<18} {statistics.median(baseline):>9.1f}")
+    for name in args.commands or COMMANDS:
+        argv = source_args(args.source, args.source_path) + COMMANDS[name]
+        timings = time_command(argv, args.runs)
+        imported = heavy_imports(argv)
+        results["commands"][name] = {
+            "argv": argv,
+            "p50_ms": percentile(timings, 0.50),
+            "p95_ms": percentile(timings, 0.95),
+            "max_ms": max(timings),
+            "heavy_imports": imported
+        }
+        print(f"{name:<18} {percentile(timings, 0.50):>9.1f} {percentile(timings, 0.95):>9.1f} "
+              f"{max(timings):>9.1f}  {', '.join(imported) or '-'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
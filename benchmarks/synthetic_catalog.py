@@ -0,0 +1,120 @@
+"""
+Synthetic HSN catalog generator for benchmarks.
+
+Generates catalogs of any size with the same shape as the real tariff:
+2-digit chapters, 4-digit headings, 6-digit subheadings and 8-digit
+tariff items in roughly the real proportions, with descriptions that
+repeat their parent's wording the way hierarchical descriptions do.
+
+Usage:
+    python benchmarks/synthetic_catalog.py 1000000 synthetic_1m.csv
+"""
+import argparse
+import csv
+import random
+
+WORDS = [
+    "LIVE", "ANIMALS", "HORSES", "ASSES", "MULES", "BOVINE", "SWINE", "SHEEP", "GOATS", "POULTRY",
+    "MEAT", "FISH", "FRESH", "CHILLED", "FROZEN", "DRIED", "SALTED", "SMOKED", "MILK", "CREAM",
+    "VEGETABLES", "FRUIT", "NUTS", "COFFEE", "TEA", "SPICES", "CEREALS", "FLOUR", "SEEDS", "OILS",
+    "SUGAR", "COCOA", "PREPARATIONS", "BEVERAGES", "TOBACCO", "SALT", "ORES", "MINERAL", "FUELS",
+    "CHEMICALS", "ORGANIC", "INORGANIC", "PHARMACEUTICAL", "FERTILISERS", "PAINTS", "PLASTICS",
+    "RUBBER", "LEATHER", "WOOD", "PAPER", "COTTON", "WOOL", "SILK", "YARN", "FABRICS", "APPAREL",
+    "FOOTWEAR", "CERAMIC", "GLASS", "PEARLS", "IRON", "STEEL", "COPPER", "ALUMINIUM", "TOOLS",
+    "MACHINERY", "ELECTRICAL", "EQUIPMENT", "VEHICLES", "AIRCRAFT", "SHIPS", "OPTICAL", "CLOCKS",
+    "INSTRUMENTS", "FURNITURE", "TOYS", "ARTICLES", "PARTS", "ACCESSORIES", "PURE-BRED", "BREEDING",
+    "WHOLE", "CUT", "BONELESS", "WITH", "WITHOUT", "NOT", "EXCEEDING", "WEIGHT", "CONTENT", "FORMS",
+    "PRIMARY", "SHEETS", "PLATES", "TUBES", "WIRE", "BARS", "ROLLED", "COATED", "PROCESSED", "RAW",
+]
+
+def level_counts(rows, chapters=97):
+    """
+    Split a target row count across the four code levels.
+
+    Returns:
+        tuple: (chapters, headings per chapter, subheadings per heading)
+    """
+    chapters = min(chapters, max(1, rows // 100))
+    headings = max(1, min(99, round(rows * 0.057 / chapters)))
+    subheadings = max(1, min(99, round(rows * 0.27 / (chapters * headings))))
+    return chapters, headings, subheadings
+
+def describe(rng, parent_description, words):
+    """
+    Build a description that extends its parent's wording.
+    """
+    extra = " ".join(rng.choice(WORDS) for _ in range(words))
+    return f"{parent_description} {extra}" if parent_description else extra
+
+def generate_catalog(rows, seed=42):
+    """
+    Generate a synthetic HSN catalog.
+
+    Args:
+        rows (int): Approximate number of codes to generate
+        seed (int): Random seed, so catalogs are reproducible
+
+    Yields:
+        tuple: (hsn_code, description) pairs in code order
+    """
+    rng = random.Random(seed)
+    chapters, headings, subheadings = level_counts(rows)
+    total_subheadings = chapters * headings * subheadings
+    items = max(0, rows - chapters - chapters * headings - total_subheadings)
+    per_subheading, extra_items = divmod(items, total_subheadings)
+    if per_subheading >= 99:
+        raise ValueError(f"{rows} rows do not fit in 8-digit codes")
+
+    position = 0
+    for chapter in range(1, chapters + 1):
+        chapter_code = f"{chapter:02d}"
+        chapter_description = describe(rng, "", 3)
+        yield chapter_code, chapter_description
+
+        for heading in range(1, headings + 1):
+            heading_code = f"{chapter_code}{heading:02d}"
+            heading_description = describe(rng, chapter_description, 3)
+            yield heading_code, heading_description
+
+            for subheading in range(1, subheadings + 1):
+                subheading_code = f"{heading_code}{subheading:02d}"
+                subheading_description = describe(rng, heading_description, 2)
+                yield subheading_code, subheading_description
+
+                # Tariff items are numbered 10, 20, ... like the real tariff when there is room
+                count = per_subheading + (1 if position < extra_items else 0)
+                step = 10 if count < 10 else 1
+                position += 1
+                for item in range(1, count + 1):
+                    yield f"{subheading_code}{item * step:02d}", describe(rng, subheading_description, 2)
+
+def write_catalog_csv(csv_path, rows, seed=42):
+    """
+    Write a synthetic catalog as a cleaned HSN CSV file.
+
+    Args:
+        csv_path (str): Output CSV path
+        rows (int): Approximate number of codes to generate
+        seed (int): Random seed
+
+    Returns:
+        int: Number of codes written
+    """
+    count = 0
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["HSNCode", "Description"])
+        for record in generate_catalog(rows, seed):
+            writer.writerow(record)
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic HSN catalog CSV")
+    parser.add_argument("rows", type=int, help="Approximate number of codes")
+    parser.add_argument("output", help="Output CSV path")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    count = write_catalog_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {count} codes to {args.output}")
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Size-bounded least-recently-used cache with optional time-to-live.
+    Keeps hit, miss and eviction counters. Safe to share across threads.
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries. 0 disables caching
+            ttl (float): Seconds an entry stays valid. If None, entries never expire
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or LRUCache.MISSING if absent or expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return self.MISSING
+
+            value, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self.entries[key]
+                self.misses += 1
+                return self.MISSING
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all entries. Counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Size, capacity and hit/miss/eviction counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,181 @@
+import re
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    # SciPy is optional: without it batches are scored with NumPy alone
+    sparse = None
+
+# Same tokens as code_index.tokenize, lowercasing the whole text once
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+class HSNClassifier:
+    """
+    TF-IDF ranker mapping free-text product descriptions to HSN codes.
+
+    The catalog descriptions are turned into a sparse, L2-normalized TF-IDF
+    matrix once, stored term by term (each term's documents and weights).
+    A batch of queries is vectorized the same way and scored against every
+    description at once as a sparse matrix product, with SciPy when it is
+    installed and otherwise with NumPy by expanding the postings of the
+    query terms and summing them with bincount. Scores are cosine
+    similarities between 0 and 1.
+    """
+
+    def __init__(self, records, block_cells=1 << 22):
+        """
+        Build the TF-IDF matrix.
+
+        Args:
+            records (iterable): Records with 'hsn_code' and 'description'
+            block_cells (int): Maximum number of query x description scores held
+                at a time, bounding memory for large batches and catalogs
+        """
+        self.records = list(records)
+        self.block_cells = block_cells
+        self.vocabulary = {}
+
+        doc_ids = []
+        term_ids = []
+        counts = []
+        vocabulary = self.vocabulary
+        for doc_id, record in enumerate(self.records):
+            doc_counts = {}
+            for term in TOKEN_PATTERN.findall(record.description.lower()):
+                doc_counts[term] = doc_counts.get(term, 0) + 1
+            for term, count in doc_counts.items():
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    term_id = vocabulary[term] = len(vocabulary)
+                doc_ids.append(doc_id)
+                term_ids.append(term_id)
+                counts.append(count)
+
+        n_docs = len(self.records)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        # Smoothed inverse document frequency, so terms in every description still count a little
+        self.idf = np.log((1.0 + n_docs) / (1.0 + document_frequency)) + 1.0
+        weights = _normalize(doc_ids, (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * self.idf[term_ids], n_docs)
+
+        # Term-major postings: the documents of term t are posting_docs[posting_starts[t]:posting_starts[t + 1]]
+        order = np.argsort(term_ids, kind='stable')
+        self.posting_docs = doc_ids[order]
+        self.posting_weights = weights[order]
+        self.posting_starts = np.concatenate(([0], np.cumsum(document_frequency)))
+
+        self.matrix = None
+        if sparse is not None:
+            self.matrix = sparse.csr_matrix(
+                (self.posting_weights, self.posting_docs, self.posting_starts),
+                shape=(len(vocabulary), n_docs)
+            )
+
+    def __len__(self):
+        return len(self.records)
+
+    def _vectorize(self, queries):
+        """
+        Turn queries into sparse TF-IDF vectors, skipping words not in the catalog.
+
+        Returns:
+            tuple: (query ids, term ids, weights) arrays, ordered by query
+        """
+        vocabulary = self.vocabulary
+        query_ids = []
+        term_ids = []
+        counts = []
+        for query_id, query in enumerate(queries):
+            query_counts = {}
+            for term in TOKEN_PATTERN.findall(query.lower()):
+                term_id = vocabulary.get(term)
+                if term_id is not None:
+                    query_counts[term_id] = query_counts.get(term_id, 0) + 1
+            for term_id, count in query_counts.items():
+                query_ids.append(query_id)
+                term_ids.append(term_id)
+                counts.append(count)
+
+        query_ids = np.asarray(query_ids, dtype=np.int64)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        weights = (1.0 + np.log(np.asarray(counts, dtype=np.float64))) * self.idf[term_ids]
+        return query_ids, term_ids, _normalize(query_ids, weights, len(queries))
+
+    def _score_block(self, query_ids, term_ids, weights, n_queries):
+        """
+        Score a block of query vectors against every description.
+
+        Returns:
+            np.ndarray: Dense (n_queries, n_descriptions) score matrix
+        """
+        n_docs = len(self.records)
+        if self.matrix is not None:
+            queries = sparse.csr_matrix((weights, (query_ids, term_ids)), shape=(n_queries, len(self.vocabulary)))
+            return (queries @ self.matrix).toarray()
+
+        # Expand each (query, term) pair into the postings of its term
+        starts = self.posting_starts[term_ids]
+        lengths = self.posting_starts[term_ids + 1] - starts
+        total = int(lengths.sum())
+        ends = np.cumsum(lengths)
+        positions = np.arange(total) - np.repeat(ends - lengths - starts, lengths)
+        cells = np.repeat(query_ids * n_docs, lengths) + self.posting_docs[positions]
+        products = np.repeat(weights, lengths) * self.posting_weights[positions]
+        return np.bincount(cells, products, minlength=n_queries * n_docs).reshape(n_queries, n_docs)
+
+    def classify_many(self, queries, top_k=5):
+        """
+        Rank the catalog codes for a batch of descriptions.
+
+        Args:
+            queries (list): Free-text descriptions
+            top_k (int): Number of candidates per description
+
+        Returns:
+            list: One list per query of records with an added 'score', best match
+                  first. Queries sharing no word with the catalog get no candidates
+        """
+        queries = list(queries)
+        results = []
+        if not queries or not self.records or top_k <= 0:
+            return [[] for _ in queries]
+
+        query_ids, term_ids, weights = self._vectorize(queries)
+        block_size = max(1, self.block_cells // len(self.records))
+        bounds = np.searchsorted(query_ids, np.arange(0, len(queries) + block_size, block_size))
+        for block, first in enumerate(range(0, len(queries), block_size)):
+            n_queries = min(block_size, len(queries) - first)
+            start, end = bounds[block], bounds[block + 1]
+            scores = self._score_block(query_ids[start:end] - first, term_ids[start:end],
+                                       weights[start:end], n_queries)
+            for row in scores:
+                results.append(self._top_k(row, top_k))
+        return results
+
+    def _top_k(self, row, top_k):
+        """
+        Pick the best scoring records of one score row, ties broken by code order.
+        """
+        doc_ids = np.flatnonzero(row > 0.0)
+        scores = row[doc_ids]
+        if len(doc_ids) > top_k:
+            # Keep everything tied with the k-th best score so ties resolve by position
+            threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            keep = scores >= threshold
+            doc_ids = doc_ids[keep]
+            scores = scores[keep]
+        order = np.lexsort((doc_ids, -scores))[:top_k]
+        records = self.records
+        return [dict(records[doc_id], score=round(score, 4))
+                for doc_id, score in zip(doc_ids[order].tolist(), scores[order].tolist())]
+
+
+def _normalize(row_ids, weights, n_rows):
+    """
+    Scale sparse weights so each row's vector has unit length.
+    """
+    norms = np.sqrt(np.bincount(row_ids, weights * weights, minlength=n_rows))
+    norms[norms == 0.0] = 1.0
+    return weights / norms[row_ids]
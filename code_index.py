@@ -0,0 +1,609 @@
+import bisect
+import heapq
+import math
+import re
+import sys
+from records import make_record, strings_size
+
+class HSNCodeIndex:
+    """
+    In-memory index of HSN codes built once when the data is loaded.
+    Answers exact lookups, parent chains and prefix searches without
+    touching the underlying data source. Records are compact HSNRecord
+    objects whose descriptions are interned, so a description shared by
+    several codes is stored once.
+    """
+
+    def __init__(self, records=None):
+        """
+        Initialize the index.
+
+        Args:
+            records (iterable): Optional iterable of (hsn_code, description) pairs
+        """
+        self.records = {}
+        self.codes = []
+
+        if records is not None:
+            self.build(records)
+
+    def build(self, records):
+        """
+        Build the index from (hsn_code, description) pairs.
+
+        Args:
+            records (iterable): Iterable of (hsn_code, description) pairs
+
+        Returns:
+            HSNCodeIndex: The index itself
+        """
+        self.records = {}
+        for hsn_code, description in records:
+            hsn_code = str(hsn_code).strip()
+            self.records[hsn_code] = make_record(hsn_code, str(description).strip())
+
+        # Sorted code list for prefix range lookups
+        self.codes = sorted(self.records)
+        return self
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, hsn_code):
+        return hsn_code in self.records
+
+    def get(self, hsn_code):
+        """
+        Get the record for an exact HSN code.
+
+        Args:
+            hsn_code (str): HSN code to look up
+
+        Returns:
+            HSNRecord: Matching record, or None if the code does not exist
+        """
+        return self.records.get(hsn_code)
+
+    def existing_codes(self, codes):
+        """
+        Get which of many candidate codes are in the index.
+
+        Args:
+            codes (list): Candidate codes
+
+        Returns:
+            list: The candidates present in the index, in input order
+        """
+        records = self.records
+        return [code for code in codes if code in records]
+
+    def parents(self, hsn_code):
+        """
+        Get the existing parent records of an HSN code.
+
+        Parents are the 2-digit step prefixes of the code (chapter,
+        heading, subheading), ordered from the broadest to the narrowest.
+
+        Args:
+            hsn_code (str): HSN code to get the parents of
+
+        Returns:
+            list: List of parent records
+        """
+        records = self.records
+        parents = []
+        for i in range(2, len(hsn_code), 2):
+            record = records.get(hsn_code[:i])
+            if record is not None:
+                parents.append(record)
+        return parents
+
+    def iter_records(self):
+        """
+        Iterate over all records in code order.
+
+        Yields:
+            HSNRecord: Record with 'hsn_code' and 'description'
+        """
+        for code in self.codes:
+            yield self.records[code]
+
+    def prefix_search(self, prefix):
+        """
+        Get all records whose code starts with the given prefix.
+
+        Args:
+            prefix (str): Code prefix to search for
+
+        Returns:
+            list: List of matching records ordered by code
+        """
+        start = bisect.bisect_left(self.codes, prefix)
+        end = bisect.bisect_left(self.codes, prefix + '\uffff', start)
+        return [self.records[code] for code in self.codes[start:end]]
+
+    def memory_usage(self):
+        """
+        Measure the memory held by the index.
+
+        Returns:
+            dict: Number of records, total bytes, and bytes and count of the distinct descriptions
+        """
+        records = self.records.values()
+        description_bytes, unique_descriptions = strings_size(record.description for record in records)
+        total = (sys.getsizeof(self.records) + sys.getsizeof(self.codes)
+                 + sum(sys.getsizeof(record) for record in records)
+                 + strings_size(self.records)[0] + description_bytes)
+        return {
+            'records': len(self.records),
+            'bytes': total,
+            'description_bytes': description_bytes,
+            'unique_descriptions': unique_descriptions
+        }
+
+
+class HSNDescriptionIndex:
+    """
+    In-memory inverted index over HSN code descriptions.
+    Mirrors the SQLite FTS5 search used by the database backend: queries
+    are tokenized, every token must match, a trailing '*' makes a token a
+    prefix match, and results are ranked with BM25.
+    """
+
+    TOKEN_PATTERN = re.compile(r'[^\W_]+\*?')
+
+    def __init__(self, records, k1=1.2, b=0.75):
+        """
+        Build the index.
+
+        Args:
+            records (list): List of record dicts with 'hsn_code' and 'description'
+            k1 (float): BM25 term frequency saturation parameter
+            b (float): BM25 length normalization parameter
+        """
+        self.records = list(records)
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_lengths = []
+
+        for doc_id, record in enumerate(self.records):
+            tokens = tokenize(record['description'])
+            self.doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, {})[doc_id] = tf
+
+        self.vocabulary = sorted(self.postings)
+        total_length = sum(self.doc_lengths)
+        self.avg_length = total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def _expand(self, term):
+        """
+        Expand a query term into the indexed tokens it matches.
+        """
+        if not term.endswith('*'):
+            return [term] if term in self.postings else []
+
+        prefix = term[:-1]
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + '\uffff', start)
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=None, offset=0):
+        """
+        Search descriptions and return records ranked by BM25.
+
+        Args:
+            query (str): Search query, e.g. 'live hors*'
+            limit (int): Maximum number of results. If None, all results are returned
+            offset (int): Number of ranked results to skip
+
+        Returns:
+            list: List of matching records, best match first
+        """
+        terms = [term.lower() for term in self.TOKEN_PATTERN.findall(query)]
+        if not terms:
+            return []
+
+        n_docs = len(self.records)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self._expand(term):
+                postings = self.postings[token]
+                idf = math.log((n_docs - len(postings) + 0.5) / (len(postings) + 0.5) + 1.0)
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                    term_scores[doc_id] = term_scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            # Every term must match, as in FTS5's implicit AND
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return []
+
+        records = self.records
+        key = lambda doc_id: (-scores[doc_id], records[doc_id]['hsn_code'])
+        if limit is None:
+            ranked = sorted(scores, key=key)[offset:]
+        else:
+            # Only the requested page needs ordering, not every matching document
+            ranked = heapq.nsmallest(offset + limit, scores, key=key)[offset:]
+        return [records[doc_id] for doc_id in ranked]
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: List of tokens
+    """
+    return [token.lower() for token in re.findall(r'[^\W_]+', text)]
+
+
+class HSNTrigramIndex:
+    """
+    Character-trigram index over description words for typo-tolerant search.
+    Query words are matched to catalog words by trigram similarity (Dice
+    coefficient), so 'hores' still finds 'horses'. Only the vocabulary is
+    compared against the query, never the descriptions themselves, so the
+    cost depends on the number of distinct words rather than on the
+    catalog size.
+    """
+
+    def __init__(self, records, min_similarity=0.4, max_expansions=10):
+        """
+        Build the index.
+
+        Args:
+            records (iterable): Records with 'hsn_code' and 'description'
+            min_similarity (float): Minimum trigram similarity for a word to match
+            max_expansions (int): Maximum number of catalog words matched per query word
+        """
+        self.records = list(records)
+        self.min_similarity = min_similarity
+        self.max_expansions = max_expansions
+
+        word_ids = {}
+        self.word_docs = []
+        for doc_id, record in enumerate(self.records):
+            for word in set(tokenize(record['description'])):
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = word_ids[word] = len(self.word_docs)
+                    self.word_docs.append([])
+                self.word_docs[word_id].append(doc_id)
+
+        self.words = list(word_ids)
+        self.word_trigram_counts = []
+        self.trigram_words = {}
+        for word_id, word in enumerate(self.words):
+            grams = trigrams(word)
+            self.word_trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_words.setdefault(gram, []).append(word_id)
+
+        n_docs = len(self.records)
+        self.word_idf = [math.log(1.0 + n_docs / len(docs)) for docs in self.word_docs]
+
+    def similar_words(self, word):
+        """
+        Find catalog words similar to a query word.
+
+        Args:
+            word (str): Query word
+
+        Returns:
+            list: (word_id, similarity) pairs, most similar first
+        """
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for word_id in self.trigram_words.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+
+        matches = []
+        for word_id, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + self.word_trigram_counts[word_id])
+            if similarity >= self.min_similarity:
+                matches.append((word_id, similarity))
+        return heapq.nlargest(self.max_expansions, matches, key=lambda match: match[1])
+
+    def search(self, query, top_k=10):
+        """
+        Find the descriptions most similar to a query.
+
+        Each query word contributes the squared similarity of its
+        best-matching word in a description, weighted by the rarity of the
+        catalog word most similar to the query word. The rarity of a query
+        word is the same for every description, so a closer spelling always
+        outranks a rarer but more distant word.
+
+        Args:
+            query (str): Free-text query, possibly misspelled
+            top_k (int): Number of results to return
+
+        Returns:
+            list: Records with an added 'score', best match first
+        """
+        scores = {}
+        for term in set(tokenize(query)):
+            matches = self.similar_words(term)
+            if not matches:
+                continue
+            idf = self.word_idf[matches[0][0]]
+            best = {}
+            for word_id, similarity in matches:
+                weight = similarity * similarity * idf
+                for doc_id in self.word_docs[word_id]:
+                    if weight > best.get(doc_id, 0.0):
+                        best[doc_id] = weight
+            for doc_id, weight in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [dict(self.records[doc_id], score=round(score, 4)) for doc_id, score in top]
+
+
+def trigrams(word):
+    """
+    Get the set of padded character trigrams of a word.
+
+    Args:
+        word (str): Word to split
+
+    Returns:
+        set: Trigrams, including the word boundary markers
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class HSNCodeSuggester:
+    """
+    "Did you mean" suggestions for mistyped codes.
+    Finds the valid codes nearest to a code by Damerau-Levenshtein (optimal
+    string alignment) distance, so substituted, inserted, deleted and
+    transposed digits are all one edit. Nothing is built beyond the index
+    the catalog is already loaded into:
+
+    - codes one edit away are found anywhere in the catalog by generating
+      every one-edit variant of the code (under two hundred for an 8-digit
+      code) and checking them against the index in one batch;
+    - codes two edits away are only looked for, when fewer than k closer
+      codes exist, among the codes under the same 4-digit heading, whose
+      number is bounded by the tariff structure rather than the catalog
+      size.
+
+    The cost of a suggestion therefore stays flat as the catalog grows.
+    """
+
+    DIGITS = '0123456789'
+
+    def __init__(self, index):
+        """
+        Initialize the suggester.
+
+        Args:
+            index: Catalog index providing existing_codes and prefix_search
+                (HSNCodeIndex, HSNArrayIndex or HSNSnapshot)
+        """
+        self.index = index
+
+    def suggest(self, hsn_code, k=3, max_distance=2):
+        """
+        Find the catalog codes nearest to a code.
+
+        Args:
+            hsn_code (str): Code to find neighbours for
+            k (int): Maximum number of suggestions
+            max_distance (int): Maximum edit distance of a suggestion
+
+        Returns:
+            list: (code, distance) pairs, nearest first, preferring codes of the same length
+        """
+        if k <= 0 or max_distance <= 0:
+            return []
+
+        matches = {code: 1 for code in self.index.existing_codes(self.neighbours(hsn_code))}
+
+        # Heading-level codes have no narrower group to draw distant codes from
+        if len(matches) < k and max_distance > 1 and len(hsn_code) >= 6:
+            heading = hsn_code[:4]
+            suffix = hsn_code[4:]
+            for record in self.index.prefix_search(heading):
+                code = record.hsn_code
+                if code not in matches and code != hsn_code:
+                    # The shared heading does not change the distance
+                    distance = osa_distance(suffix, code[4:], max_distance)
+                    if distance <= max_distance:
+                        matches[code] = distance
+
+        ranked = sorted(matches.items(), key=lambda match: (match[1], abs(len(match[0]) - len(hsn_code)), match[0]))
+        return ranked[:k]
+
+    def neighbours(self, hsn_code):
+        """
+        Get every string one digit edit away from a code.
+
+        Args:
+            hsn_code (str): Code to edit
+
+        Returns:
+            set: Codes reached by one substitution, insertion, deletion or adjacent transposition
+        """
+        digits = self.DIGITS
+        variants = set()
+        for i in range(len(hsn_code) + 1):
+            head = hsn_code[:i]
+            tail = hsn_code[i:]
+            for digit in digits:
+                variants.add(head + digit + tail)
+            if tail:
+                rest = tail[1:]
+                variants.add(head + rest)
+                for digit in digits:
+                    variants.add(head + digit + rest)
+                if rest:
+                    variants.add(head + rest[0] + tail[0] + rest[1:])
+        variants.discard(hsn_code)
+        return variants
+
+
+def osa_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance between two short strings, giving up
+    as soon as it must exceed a bound.
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        max_distance (int): Distance above which the exact value does not matter
+
+    Returns:
+        int: The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Common leading and trailing characters never change the distance
+    while a and b and a[-1] == b[-1]:
+        a = a[:-1]
+        b = b[:-1]
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a = a[start:]
+    b = b[start:]
+    if not a or not b:
+        return min(len(a) + len(b), max_distance + 1)
+
+    prev_prev_row = None
+    prev_row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        char = a[i - 1]
+        row = [i]
+        for j in range(1, len(b) + 1):
+            value = prev_row[j - 1] if char == b[j - 1] else prev_row[j - 1] + 1
+            if prev_row[j] + 1 < value:
+                value = prev_row[j] + 1
+            if row[j - 1] + 1 < value:
+                value = row[j - 1] + 1
+            if (i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]
+                    and prev_prev_row[j - 2] + 1 < value):
+                value = prev_prev_row[j - 2] + 1
+            row.append(value)
+        # A transposition in the next row can still reach back to the previous row
+        if min(row) > max_distance and min(prev_row) + 1 > max_distance:
+            return max_distance + 1
+        prev_prev_row, prev_row = prev_row, row
+    return min(prev_row[-1], max_distance + 1)
+
+
+class HSNHierarchy:
+    """
+    Parent/child structure of the HSN catalog, computed once from its codes.
+    A code's parent is its longest existing 2-digit step prefix (the same
+    rule HSNCodeIndex.parents uses), and its level is the number of
+    existing ancestors, so chapters and other roots are at level 0.
+    """
+
+    def __init__(self, codes):
+        """
+        Build the hierarchy.
+
+        Args:
+            codes (iterable): Catalog codes
+        """
+        self.parent = {}
+        self.level = {}
+        self.children = {None: []}
+
+        # In sorted order every prefix comes before the codes under it
+        for code in sorted(set(codes)):
+            parent = None
+            for i in reversed(range(2, len(code), 2)):
+                if code[:i] in self.level:
+                    parent = code[:i]
+                    break
+            self.parent[code] = parent
+            self.level[code] = 0 if parent is None else self.level[parent] + 1
+            self.children[parent].append(code)
+            self.children[code] = []
+        self.sorted_codes = list(self.level)
+
+    def __contains__(self, code):
+        return code in self.level
+
+    def descendants_by_prefix(self, code):
+        """
+        Get the codes that have a code as a 2-digit step prefix, whether or not
+        the code itself exists. These are the codes whose ancestors change
+        when the code is added or removed. Step prefixes have an even
+        length, so an odd-length code is an ancestor of no other code.
+        """
+        if len(code) % 2:
+            return []
+        codes = self.sorted_codes
+        start = bisect.bisect_right(codes, code)
+        end = bisect.bisect_left(codes, code + '\uffff', start)
+        return codes[start:end]
+
+    def ancestors(self, code):
+        """
+        Get the ancestors of a code, broadest first.
+        """
+        chain = []
+        parent = self.parent.get(code)
+        while parent is not None:
+            chain.append(parent)
+            parent = self.parent[parent]
+        chain.reverse()
+        return chain
+
+    def subtree(self, code, depth=None):
+        """
+        Get the descendants of a code in code order.
+
+        Args:
+            code (str): Root of the subtree. None for the whole catalog
+            depth (int): Maximum number of levels below the root. If None, all levels
+
+        Returns:
+            list: (code, depth below the root) pairs
+        """
+        if depth is not None and depth < 1:
+            return []
+        results = []
+        stack = [(child, 1) for child in reversed(self.children.get(code, []))]
+        while stack:
+            child, child_depth = stack.pop()
+            results.append((child, child_depth))
+            if depth is None or child_depth < depth:
+                stack.extend((grandchild, child_depth + 1) for grandchild in reversed(self.children[child]))
+        return results
+
+    def closure(self, codes=None):
+        """
+        Iterate over the transitive closure of the hierarchy.
+
+        Args:
+            codes (iterable): Descendant codes to include. If None, all codes
+
+        Yields:
+            tuple: (ancestor, descendant, depth), including (code, code, 0) for every code
+        """
+        for code in (self.level if codes is None else codes):
+            yield code, code, 0
+            for depth, ancestor in enumerate(reversed(self.ancestors(code)), 1):
+                yield ancestor, code, depth
@@ -0,0 +1,194 @@
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from agent import HSNCodeAgent
+from records import json_default
+
+# Warm agent owned by each worker process
+_worker_agent = None
+
+CSV_FIELDS = ['file', 'code', 'valid', 'start', 'end', 'description', 'reason']
+
+def _init_worker(data_source, source_path):
+    """
+    Load one agent per worker process, reused for every file it handles.
+    """
+    global _worker_agent
+    _worker_agent = HSNCodeAgent(data_source, source_path)
+
+def _extract_file(path):
+    """
+    Extract HSN codes from one file in a worker process.
+
+    Returns:
+        tuple: (path, results, stats)
+    """
+    start_time = time.perf_counter()
+    with open(path, encoding='utf-8', errors='replace') as f:
+        results = list(_worker_agent.extract_hsn_codes_stream(f))
+
+    valid = sum(1 for result in results if result['valid'])
+    stats = {
+        'file': path,
+        'bytes': os.path.getsize(path),
+        'candidates': len(results),
+        'valid': valid,
+        'invalid': len(results) - valid,
+        'distinct_codes': len({result['code'] for result in results}),
+        'seconds': time.perf_counter() - start_time
+    }
+    return path, results, stats
+
+def find_files(inputs, pattern="*.txt"):
+    """
+    Expand directories and glob patterns into a sorted list of files.
+
+    Args:
+        inputs (list): Directories, glob patterns or file paths
+        pattern (str): File pattern used when an input is a directory
+
+    Returns:
+        list: Sorted, de-duplicated file paths
+    """
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, '**', pattern), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        files.update(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return sorted(files)
+
+def read_checkpoint(checkpoint_path):
+    """
+    Read the files completed by a previous run.
+
+    Each checkpoint line holds the size of the output once a file's results
+    were written, a tab and the file path. A line cut short by a crash has
+    no trailing newline and is ignored, so its file is processed again.
+
+    Args:
+        checkpoint_path (str): Path to the checkpoint file
+
+    Returns:
+        tuple: (set of completed file paths, output size in bytes after the
+               last completed file, or None if no file was completed)
+    """
+    completed = set()
+    output_size = None
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return completed, output_size
+    with open(checkpoint_path, encoding='utf-8') as f:
+        for line in f:
+            size, tab, path = line.partition('\t')
+            if not line.endswith('\n') or not tab or not size.isdigit():
+                continue
+            completed.add(path[:-1])
+            output_size = int(size)
+    return completed, output_size
+
+def _write_results(writer, output_format, path, results):
+    """
+    Write one file's extraction results to the merged output.
+    """
+    for result in results:
+        if output_format == 'csv':
+            details = result.get('details') or {}
+            writer.writerow({
+                'file': path,
+                'code': result['code'],
+                'valid': result['valid'],
+                'start': result['start'],
+                'end': result['end'],
+                'description': details.get('description', ''),
+                'reason': result.get('reason', '')
+            })
+        else:
+            writer.write(json.dumps(dict(result, file=path), default=json_default) + '\n')
+
+def extract_directory(inputs, output_path, output_format="jsonl", workers=None, checkpoint_path=None,
+                      pattern="*.txt", data_source="database", source_path=None):
+    """
+    Extract HSN codes from many documents using a process pool.
+
+    Each worker process loads one agent and keeps it warm for all the files
+    it handles. Use the 'snapshot' source so workers share one memory-mapped
+    catalog instead of each holding a private copy. Results are merged into
+    a single JSONL or CSV file in the parent process. With a checkpoint
+    file, completed files are recorded as their results are written, and a
+    rerun skips them and appends to the existing output, first truncating
+    it to its size after the last completed file so results written just
+    before an interruption are not duplicated.
+
+    Args:
+        inputs (list): Directories, glob patterns or file paths
+        output_path (str): Merged output file
+        output_format (str): 'jsonl' or 'csv'
+        workers (int): Number of worker processes (default: CPU count)
+        checkpoint_path (str): Checkpoint file for resumable runs
+        pattern (str): File pattern used when an input is a directory
+        data_source (str): Type of data source ('database', 'csv', 'json', 'snapshot')
+        source_path (str): Path to the data source
+
+    Returns:
+        list: Per-file statistics for the files processed in this run
+    """
+    files = find_files(inputs, pattern)
+    completed, output_size = read_checkpoint(checkpoint_path)
+    pending = [path for path in files if path not in completed]
+    print(f"Found {len(files)} files, {len(files) - len(pending)} already done, {len(pending)} to process")
+
+    resuming = bool(completed) and os.path.exists(output_path)
+    if resuming:
+        # Drop results of a file that was written but not yet checkpointed
+        with open(output_path, 'r+b') as f:
+            f.truncate(output_size)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        # Drop a checkpoint line cut short by an interruption
+        with open(checkpoint_path, 'r+b') as f:
+            content = f.read()
+            f.truncate(content.rfind(b'\n') + 1 if resuming else 0)
+    output = open(output_path, 'a' if resuming else 'w', newline='', encoding='utf-8')
+    checkpoint = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+
+    if output_format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        if not resuming:
+            writer.writeheader()
+    else:
+        writer = output
+
+    all_stats = []
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_source, source_path)) as executor:
+            futures = [executor.submit(_extract_file, path) for path in pending]
+            for future in as_completed(futures):
+                path, results, stats = future.result()
+                _write_results(writer, output_format, path, results)
+                output.flush()
+
+                # Record the file as done only after its results are on disk,
+                # with the output size a resumed run truncates back to
+                if checkpoint:
+                    checkpoint.write(f"{output.tell()}\t{path}\n")
+                    checkpoint.flush()
+
+                all_stats.append(stats)
+                print(f"{stats['file']}: {stats['candidates']} candidates, {stats['valid']} valid "
+                      f"({stats['seconds']:.2f}s)")
+    finally:
+        output.close()
+        if checkpoint:
+            checkpoint.close()
+
+    elapsed = time.perf_counter() - start_time
+    total_bytes = sum(stats['bytes'] for stats in all_stats)
+    total_candidates = sum(stats['candidates'] for stats in all_stats)
+    print(f"Processed {len(all_stats)} files ({total_bytes / 1e6:.1f} MB, {total_candidates} candidates) "
+          f"in {elapsed:.2f}s ({total_bytes / 1e6 / elapsed if elapsed > 0 else 0:.1f} MB/s)")
+    return all_stats
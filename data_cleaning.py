@@ -1,6 +1,34 @@
+import argparse
 import pandas as pd
+import numpy as np
 import re
 import os
+import time
+
+def normalize_frame(df):
+    """
+    Apply the row-level cleaning rules to a raw frame.
+
+    Removes rows containing 'other' in the description (case-insensitive),
+    strips HSN codes and collapses whitespace in descriptions. Every step
+    is vectorized and builds a new frame, so the input is never written to.
+
+    Args:
+        df (pd.DataFrame): Raw frame with HSNCode and Description columns
+
+    Returns:
+        tuple: (cleaned DataFrame, number of 'other' rows removed)
+    """
+    # Fix column names (remove any leading/trailing whitespace, e.g. '\nHSNCode')
+    df = df.rename(columns=lambda col: col.strip())
+
+    keep = ~df['Description'].str.contains('other', case=False, na=False)
+    kept = df[keep]
+    cleaned = pd.DataFrame({
+        'HSNCode': kept['HSNCode'].astype(str).str.strip(),
+        'Description': kept['Description'].str.strip().str.replace(r'\s+', ' ', regex=True)
+    })
+    return cleaned, len(df) - len(cleaned)
 
 def clean_hsn_data(input_file, output_file=None):
     """
@@ -9,68 +37,184 @@ def clean_hsn_data(input_file, output_file=None):
     2. Standardizing HSN codes (removing whitespace, ensuring proper format)
     3. Standardizing descriptions (proper capitalization, removing extra spaces)
     4. Removing duplicates
-    
+
+    The whole file is loaded into memory. Use clean_hsn_data_streaming for
+    inputs that do not fit.
+
     Args:
         input_file (str): Path to input CSV file
         output_file (str, optional): Path to output CSV file. If None, returns DataFrame
-        
+
     Returns:
         pd.DataFrame or None: Cleaned DataFrame if output_file is None, else None
     """
     print(f"Loading data from {input_file}...")
-    df = pd.read_csv(input_file)
-    
+    # Read codes as strings to keep leading zeros (e.g. '01')
+    df = pd.read_csv(input_file, dtype=str)
+
     # Record initial count
     initial_count = len(df)
     print(f"Initial record count: {initial_count}")
-    
-    # Fix column names (remove any leading/trailing whitespace)
-    df.columns = [col.strip() for col in df.columns]
-    
-    # Rename columns if needed
-    if '\nHSNCode' in df.columns:
-        df = df.rename(columns={'\nHSNCode': 'HSNCode'})
-    
-    # 1. Remove rows containing 'other' in description (case-insensitive)
-    df_cleaned = df[~df['Description'].str.contains('other', case=False, na=False)]
-    other_removed = initial_count - len(df_cleaned)
+
+    # 1-3. Remove 'other' rows and standardize codes and descriptions
+    df_cleaned, other_removed = normalize_frame(df)
     print(f"Removed {other_removed} rows containing 'other' in description")
-    
-    # 2. Standardize HSN codes
-    df_cleaned['HSNCode'] = df_cleaned['HSNCode'].astype(str).str.strip()
-    
-    # 3. Standardize descriptions
-    # Remove extra spaces
-    df_cleaned['Description'] = df_cleaned['Description'].str.strip()
-    df_cleaned['Description'] = df_cleaned['Description'].str.replace('\s+', ' ', regex=True)
-    
+
     # 4. Remove duplicates
     initial_cleaned_count = len(df_cleaned)
     df_cleaned = df_cleaned.drop_duplicates()
     duplicates_removed = initial_cleaned_count - len(df_cleaned)
     print(f"Removed {duplicates_removed} duplicate rows")
-    
+
     # Final count
     final_count = len(df_cleaned)
     print(f"Final record count: {final_count}")
     print(f"Total reduction: {initial_count - final_count} rows ({((initial_count - final_count) / initial_count) * 100:.2f}%)")
-    
+
     # Save to file if output_file is provided
     if output_file:
         df_cleaned.to_csv(output_file, index=False)
         print(f"Cleaned data saved to {output_file}")
         return None
-    
+
     return df_cleaned
 
+def iter_cleaned_chunks(input_file, chunk_size=100000, stats=None):
+    """
+    Read and clean a raw CSV chunk by chunk.
+
+    Rows are deduplicated across the whole file, keeping the first
+    occurrence, by a sorted array of 64-bit hashes of the normalized rows.
+    Memory therefore grows by 8 bytes per distinct row rather than by the
+    row contents.
+
+    Args:
+        input_file (str): Path to input CSV file
+        chunk_size (int): Number of raw rows read per chunk
+        stats (dict, optional): Updated in place with row counters
+
+    Yields:
+        pd.DataFrame: Cleaned chunk with HSNCode and Description columns
+    """
+    if stats is None:
+        stats = {}
+    stats.update(rows_read=0, other_removed=0, duplicates_removed=0, rows_written=0)
+    seen = np.empty(0, dtype=np.uint64)
+
+    for chunk in pd.read_csv(input_file, dtype=str, chunksize=chunk_size):
+        stats['rows_read'] += len(chunk)
+        cleaned, other_removed = normalize_frame(chunk)
+        stats['other_removed'] += other_removed
+
+        # First occurrence of each row within the chunk, in input order
+        hashes = pd.util.hash_pandas_object(cleaned, index=False).to_numpy()
+        _, first = np.unique(hashes, return_index=True)
+        first.sort()
+
+        # Drop rows already seen in earlier chunks
+        candidates = hashes[first]
+        if len(seen):
+            positions = np.minimum(np.searchsorted(seen, candidates), len(seen) - 1)
+            first = first[seen[positions] != candidates]
+        new_hashes = np.sort(hashes[first])
+        seen = np.insert(seen, np.searchsorted(seen, new_hashes), new_hashes)
+
+        stats['duplicates_removed'] += len(cleaned) - len(first)
+        stats['rows_written'] += len(first)
+        yield cleaned.iloc[first]
+
+def clean_hsn_data_streaming(input_file, output_file=None, db=None, chunk_size=100000):
+    """
+    Clean an HSN code dataset of any size in bounded memory.
+
+    Applies the same rules as clean_hsn_data, one chunk at a time, and
+    writes each cleaned chunk out before reading the next. Output goes to
+    a CSV file, straight into a database, or both.
+
+    Args:
+        input_file (str): Path to input CSV file
+        output_file (str, optional): Path to output CSV file
+        db (HSNDatabase, optional): Database to bulk load the cleaned rows into
+        chunk_size (int): Number of raw rows read per chunk
+
+    Returns:
+        dict: Row counters, elapsed seconds and throughput
+    """
+    if output_file is None and db is None:
+        raise ValueError("clean_hsn_data_streaming needs an output_file, a db or both")
+
+    print(f"Streaming data from {input_file} in chunks of {chunk_size} rows...")
+    stats = {}
+    start_time = time.perf_counter()
+    chunks = iter_cleaned_chunks(input_file, chunk_size, stats)
+
+    out = None
+    if output_file:
+        # Write to a temporary file so a failed run never leaves a partial output
+        tmp_path = output_file + '.tmp'
+        out = open(tmp_path, 'w', newline='', encoding='utf-8')
+        out.write('HSNCode,Description\n')
+        chunks = _write_chunks(chunks, out)
+
+    try:
+        if db is not None:
+            db.bulk_load((hsn_code, description) for chunk in chunks
+                         for hsn_code, description in zip(chunk['HSNCode'], chunk['Description']))
+        else:
+            for _ in chunks:
+                pass
+    finally:
+        if out is not None:
+            out.close()
+
+    if output_file:
+        os.replace(tmp_path, output_file)
+
+    elapsed = time.perf_counter() - start_time
+    stats['seconds'] = elapsed
+    stats['rows_per_second'] = stats['rows_read'] / elapsed if elapsed > 0 else 0.0
+    stats['mb_per_second'] = os.path.getsize(input_file) / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+    print(f"Read {stats['rows_read']} rows")
+    print(f"Removed {stats['other_removed']} rows containing 'other' in description")
+    print(f"Removed {stats['duplicates_removed']} duplicate rows")
+    print(f"Final record count: {stats['rows_written']}")
+    print(f"Cleaned in {elapsed:.2f}s ({stats['rows_per_second']:.0f} rows/s, {stats['mb_per_second']:.1f} MB/s)")
+    if output_file:
+        print(f"Cleaned data saved to {output_file}")
+    return stats
+
+def _write_chunks(chunks, out):
+    """
+    Append each cleaned chunk to an open CSV file and pass it through.
+    """
+    for chunk in chunks:
+        chunk.to_csv(out, header=False, index=False)
+        yield chunk
+
 
 if __name__ == "__main__":
     # Get the directory of the current script
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Define input and output file paths
-    input_file = os.path.join(script_dir, "Tests", "HSN codes.csv")
-    output_file = os.path.join(script_dir, "Tests", "HSN_codes_cleaned.csv")
-    
+
+    parser = argparse.ArgumentParser(description="Clean the raw HSN code dataset")
+    parser.add_argument("input", nargs="?", default=os.path.join(script_dir, "Tests", "HSN codes.csv"),
+                        help="Raw CSV file (default: Tests/HSN codes.csv)")
+    parser.add_argument("output", nargs="?", default=os.path.join(script_dir, "Tests", "HSN_codes_cleaned.csv"),
+                        help="Cleaned CSV file (default: Tests/HSN_codes_cleaned.csv)")
+    parser.add_argument("--stream", action="store_true", help="Clean in chunks with bounded memory")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows per chunk in streaming mode (default: 100000)")
+    parser.add_argument("--db", help="Also load the cleaned rows into this SQLite database (streaming mode)")
+    args = parser.parse_args()
+
     # Clean the data
-    clean_hsn_data(input_file, output_file)
\ No newline at end of file
+    if args.stream or args.db:
+        db = None
+        if args.db:
+            from database import HSNDatabase
+            db = HSNDatabase(args.db)
+        clean_hsn_data_streaming(args.input, args.output, db, args.chunk_size)
+        if db is not None:
+            db.close()
+    else:
+        clean_hsn_data(args.input, args.output)
@@ -1,25 +1,40 @@
-import pandas as pd
-import json
 import os
 from database import HSNDatabase
+from code_index import HSNCodeIndex, HSNDescriptionIndex, HSNTrigramIndex, HSNCodeSuggester, HSNHierarchy
+from snapshot import HSNSnapshot
+from json_catalog import iter_json_records
+from extraction import HSNCodeExtractor
 
 class HSNDataLoader:
     """
-    Data loader for HSN codes from various sources (CSV, database, JSON).
+    Data loader for HSN codes from various sources (CSV, database, JSON, snapshot).
     """
     
-    def __init__(self, source_type="database", source_path=None):
+    def __init__(self, source_type="database", source_path=None, read_only=True, fuzzy=False):
         """
         Initialize the data loader.
         
         Args:
-            source_type (str): Type of data source ('database', 'csv', 'json')
+            source_type (str): Type of data source ('database', 'csv', 'json', 'snapshot')
             source_path (str): Path to the data source
+            read_only (bool): Open the database with pooled, thread-safe read-only connections
+            fuzzy (bool): Build the fuzzy search index in load_data instead of on the first fuzzy search
         """
         self.source_type = source_type.lower()
         self.source_path = source_path
-        self.data = None
+        self.read_only = read_only
+        self.fuzzy = fuzzy
         self.db = None
+        self.index = None
+        self.description_index = None
+        self.fuzzy_index = None
+        self.suggester = None
+        self.hierarchy = None
+        self.extractor = None
+        self.classifier = None
+        
+        # Optional Metrics instance passed on to the database layer
+        self.metrics = None
         
         # Set default source path if not provided
         if not source_path:
@@ -29,6 +44,8 @@ class HSNDataLoader:
                 self.source_path = os.path.join("Tests", "HSN_codes_cleaned.csv")
             elif source_type == "json":
                 self.source_path = "hsn_codes.json"
+            elif source_type == "snapshot":
+                self.source_path = "hsn_codes.snap"
     
     def load_data(self):
         """
@@ -37,32 +54,158 @@ class HSNDataLoader:
         Returns:
             bool: True if successful, False otherwise
         """
+        # Derived indexes are rebuilt from the freshly loaded data
+        self.index = None
+        self.description_index = None
+        self.fuzzy_index = None
+        self.suggester = None
+        self.hierarchy = None
+        self.extractor = None
+        self.classifier = None
+        
         try:
             if self.source_type == "database":
-                self.db = HSNDatabase(self.source_path)
+                self.db = HSNDatabase(self.source_path, read_only=self.read_only)
+                self.db.metrics = self.metrics
                 self.db.connect()
-                return True
+                self.index = HSNCodeIndex(self.db.iter_records())
             
             elif self.source_type == "csv":
-                self.data = pd.read_csv(self.source_path)
-                # Ensure column names are correct
-                if '\nHSNCode' in self.data.columns:
-                    self.data = self.data.rename(columns={'\nHSNCode': 'HSNCode'})
-                return True
+                # pandas and NumPy are only needed for the CSV source, so import them lazily
+                import pandas as pd
+                from array_index import HSNArrayIndex
+                
+                # Read codes as strings to keep leading zeros (e.g. '01'), and empty cells as ''
+                frame = pd.read_csv(self.source_path, dtype=str, keep_default_na=False).fillna('')
+                # Ensure column names are correct (e.g. '\nHSNCode')
+                frame.columns = frame.columns.str.strip()
+                # Rows without a code are skipped, as iter_csv_records does
+                codes = frame['HSNCode'].str.strip()
+                keep = codes != ''
+                # Sorted code array and exact-match hash; the frame itself is not kept
+                self.index = HSNArrayIndex(codes[keep], frame['Description'][keep])
             
             elif self.source_type == "json":
-                with open(self.source_path, 'r') as f:
-                    self.data = json.load(f)
-                return True
+                # Stream the file into the index instead of materializing the parsed document
+                self.index = HSNCodeIndex(iter_json_records(self.source_path))
+            
+            elif self.source_type == "snapshot":
+                # Lookups read straight from the memory-mapped file
+                self.index = HSNSnapshot(self.source_path)
             
             else:
                 print(f"Unsupported source type: {self.source_type}")
                 return False
+            
+            if self.fuzzy:
+                # Building the trigram index takes a while, so do it before serving queries
+                self._get_fuzzy_index()
+            return True
         
         except Exception as e:
             print(f"Error loading data: {e}")
             return False
     
+    def dataset_version(self):
+        """
+        Get a version token for the data source.
+        
+        The token changes whenever the source file is modified or replaced,
+        so it can be used to invalidate results derived from the data. For
+        the database it also includes the stored dataset version, because
+        updates committed in WAL mode do not touch the main file until the
+        next checkpoint.
+        
+        Returns:
+            tuple: (inode, size, modification time in ns[, dataset version]), or None if the file is missing
+        """
+        try:
+            stat = os.stat(self.source_path)
+        except OSError:
+            return None
+        version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self.source_type == "database" and self.db is not None:
+            version += (self.db.get_dataset_version(),)
+        return version
+    
+    def memory_report(self):
+        """
+        Report the memory held by the loaded catalog index.
+        
+        Every backend returns records as compact HSNRecord objects. The
+        database, CSV and JSON backends keep them in memory with interned
+        descriptions; the snapshot backend maps its file instead, so its
+        figure is the mapped size shared between processes.
+        
+        Returns:
+            dict: Source type, number of records, total bytes, bytes per record,
+                  and bytes and count of the distinct descriptions
+        """
+        if self.index is None:
+            return None
+        report = {'source': self.source_type}
+        report.update(self.index.memory_usage())
+        report['bytes_per_record'] = report['bytes'] / report['records'] if report['records'] else 0.0
+        return report
+    
+    def _get_description_index(self):
+        if self.description_index is None:
+            self.description_index = HSNDescriptionIndex(self.index.iter_records())
+        return self.description_index
+    
+    def _get_fuzzy_index(self):
+        if self.fuzzy_index is None:
+            self.fuzzy_index = HSNTrigramIndex(self.index.iter_records())
+        return self.fuzzy_index
+    
+    def _get_suggester(self):
+        if self.suggester is None:
+            self.suggester = HSNCodeSuggester(self.index)
+        return self.suggester
+    
+    def _get_hierarchy(self):
+        if self.hierarchy is None:
+            self.hierarchy = HSNHierarchy(record.hsn_code for record in self.index.iter_records())
+        return self.hierarchy
+    
+    def _get_extractor(self):
+        if self.extractor is None:
+            self.extractor = HSNCodeExtractor(self.index)
+        return self.extractor
+    
+    def _get_classifier(self):
+        if self.classifier is None:
+            # NumPy (and SciPy, if installed) are only needed for classification, so import lazily
+            from classifier import HSNClassifier
+            self.classifier = HSNClassifier(self.index.iter_records())
+        return self.classifier
+    
+    def warm_from(self, other):
+        """
+        Build up front the lazily created indexes that another loader has built.
+        
+        Used before swapping a freshly loaded catalog in for one that is
+        already serving requests, so the first searches after the swap do
+        not pay for building the indexes.
+        
+        Args:
+            other (HSNDataLoader): Loader whose built indexes are mirrored
+        """
+        if self.index is None:
+            return
+        if other.description_index is not None:
+            self._get_description_index()
+        if other.fuzzy_index is not None:
+            self._get_fuzzy_index()
+        if other.suggester is not None:
+            self._get_suggester()
+        if other.hierarchy is not None:
+            self._get_hierarchy()
+        if other.extractor is not None:
+            self._get_extractor()
+        if other.classifier is not None:
+            self._get_classifier()
+    
     def search_by_code(self, hsn_code):
         """
         Search for HSN codes by code.
@@ -76,42 +219,204 @@ class HSNDataLoader:
         if self.source_type == "database" and self.db:
             return self.db.search_by_code(hsn_code)
         
-        elif self.source_type == "csv" and self.data is not None:
-            # Search in DataFrame
-            matches = self.data[self.data['HSNCode'].astype(str).str.startswith(hsn_code)]
-            return matches.to_dict('records')
-        
-        elif self.source_type == "json" and self.data is not None:
-            # Search in JSON data
-            return [item for item in self.data if item['hsn_code'].startswith(hsn_code)]
+        elif self.source_type in ("csv", "json", "snapshot") and self.index is not None:
+            return self.index.prefix_search(hsn_code)
         
         return []
     
-    def search_by_description(self, description):
+    def search_by_description(self, description, limit=None, offset=0):
         """
         Search for HSN codes by description.
         
+        Results are ranked by relevance. The database backend uses its FTS5
+        index; the CSV, JSON and snapshot backends use an equivalent
+        in-memory inverted index built on the first search.
+        
         Args:
             description (str): Description to search for
+            limit (int): Maximum number of results. If None, all results are returned
+            offset (int): Number of results to skip
         
         Returns:
             list: List of matching records
         """
         if self.source_type == "database" and self.db:
-            return self.db.search_by_description(description)
-        
-        elif self.source_type == "csv" and self.data is not None:
-            # Search in DataFrame (case-insensitive)
-            matches = self.data[self.data['Description'].str.contains(description, case=False, na=False)]
-            return matches.to_dict('records')
+            return self.db.search_by_description(description, limit, offset)
         
-        elif self.source_type == "json" and self.data is not None:
-            # Search in JSON data (case-insensitive)
-            description = description.lower()
-            return [item for item in self.data if description in item['description'].lower()]
+        elif self.source_type in ("csv", "json", "snapshot") and self.index is not None:
+            return self._get_description_index().search(description, limit, offset)
         
         return []
     
+    def fuzzy_search(self, query, top_k=10):
+        """
+        Typo-tolerant description search using a trigram index.
+        
+        The index is built once from the loaded catalog, in load_data if the
+        loader was created with fuzzy=True and otherwise on the first fuzzy
+        search, and reused afterwards.
+        
+        Args:
+            query (str): Free-text query, possibly misspelled
+            top_k (int): Number of results to return
+        
+        Returns:
+            list: Records with a similarity 'score', best match first
+        """
+        if self.index is None:
+            return []
+        return self._get_fuzzy_index().search(query, top_k)
+    
+    def suggest_codes(self, hsn_code, k=3, max_distance=2):
+        """
+        Find the valid codes nearest to a mistyped code.
+        
+        Candidates are checked against the loaded index directly, so no
+        extra structure is built and the snapshot backend stays entirely
+        memory-mapped.
+        
+        Args:
+            hsn_code (str): Code to find neighbours for
+            k (int): Maximum number of suggestions
+            max_distance (int): Maximum digit edit distance (transpositions count as one edit)
+        
+        Returns:
+            list: Records with an added 'distance', nearest first
+        """
+        if self.index is None:
+            return []
+        return [dict(self.index.get(code), distance=distance)
+                for code, distance in self._get_suggester().suggest(hsn_code, k, max_distance)]
+    
+    def classify_many(self, descriptions, top_k=5):
+        """
+        Rank candidate codes for a batch of free-text product descriptions.
+        
+        The TF-IDF matrix behind the ranking is built once from the loaded
+        catalog on the first call, and each batch is scored with sparse
+        matrix products.
+        
+        Args:
+            descriptions (list): Free-text descriptions
+            top_k (int): Number of candidates per description
+        
+        Returns:
+            list: One list per description of records with a cosine similarity 'score', best match first
+        """
+        if self.index is None:
+            return [[] for _ in descriptions]
+        return self._get_classifier().classify_many(descriptions, top_k)
+    
+    def resolve_code_candidate(self, token):
+        """
+        Resolve a candidate found in text to a catalog code, rejecting non-codes.
+        
+        The digit prefixes of the token are looked up in the loaded index,
+        so no extra structure is built.
+        
+        Args:
+            token (str): Text matched by extraction.CANDIDATE_PATTERN, e.g. '0101.10.10'
+        
+        Returns:
+            tuple: (normalized code, number of token characters it spans), or None if the token is not a code
+        """
+        if self.index is None:
+            return None
+        return self._get_extractor().resolve(token)
+    
+    def get_code_details(self, hsn_code):
+        """
+        Get the record for an exact HSN code from the in-memory index.
+        
+        Args:
+            hsn_code (str): HSN code to look up
+        
+        Returns:
+            HSNRecord: Matching record, or None if the code does not exist
+        """
+        if self.index is None:
+            return None
+        return self.index.get(hsn_code)
+    
+    def get_parent_codes(self, hsn_code):
+        """
+        Get the existing parent records of an HSN code from the in-memory index.
+        
+        Args:
+            hsn_code (str): HSN code to get the parents of
+        
+        Returns:
+            list: List of parent records, broadest first
+        """
+        if self.index is None:
+            return []
+        return self.index.parents(hsn_code)
+    
+    def _use_db_hierarchy(self):
+        return self.source_type == "database" and self.db is not None and self.db.has_hierarchy()
+    
+    def get_parents(self, hsn_code):
+        """
+        Get the ancestors of an HSN code in the catalog hierarchy.
+        
+        Codes in the catalog get their ancestors from the same hierarchy as
+        get_children and get_subtree; any other code gets its existing
+        2-digit step prefixes, like get_parent_codes.
+        
+        Args:
+            hsn_code (str): HSN code to get the ancestors of
+        
+        Returns:
+            list: List of ancestor records, broadest first
+        """
+        if self._use_db_hierarchy():
+            # The closure table only holds catalog codes, and codes without ancestors get none from either
+            return self.db.get_parents(hsn_code) or self.get_parent_codes(hsn_code)
+        if self.index is None:
+            return []
+        hierarchy = self._get_hierarchy()
+        if hsn_code in hierarchy:
+            return [self.index.get(code) for code in hierarchy.ancestors(hsn_code)]
+        return self.get_parent_codes(hsn_code)
+    
+    def get_children(self, hsn_code=None):
+        """
+        Get the direct children of an HSN code in the catalog hierarchy.
+        
+        The database backend reads the precomputed parent column; the other
+        backends use a hierarchy built from the index on first use.
+        
+        Args:
+            hsn_code (str): Parent HSN code. None for the top-level codes
+        
+        Returns:
+            list: List of child records ordered by code
+        """
+        if self._use_db_hierarchy():
+            return self.db.get_children(hsn_code)
+        if self.index is None:
+            return []
+        return [self.index.get(code) for code in self._get_hierarchy().children.get(hsn_code, [])]
+    
+    def get_subtree(self, hsn_code, depth=None):
+        """
+        Get the descendants of an HSN code in the catalog hierarchy.
+        
+        Args:
+            hsn_code (str): Root of the subtree
+            depth (int): Maximum number of levels below the root. If None, all levels
+        
+        Returns:
+            list: Records with 'parent_code' and 'depth' below the root, ordered by code
+        """
+        if self._use_db_hierarchy():
+            return self.db.get_subtree(hsn_code, depth)
+        if self.index is None:
+            return []
+        hierarchy = self._get_hierarchy()
+        return [dict(self.index.get(code), parent_code=hierarchy.parent[code], depth=code_depth)
+                for code, code_depth in hierarchy.subtree(hsn_code, depth)]
+    
     def is_valid_hsn_code(self, hsn_code):
         """
         Check if an HSN code is valid.
@@ -125,13 +430,8 @@ class HSNDataLoader:
         if self.source_type == "database" and self.db:
             return self.db.is_valid_hsn_code(hsn_code)
         
-        elif self.source_type == "csv" and self.data is not None:
-            # Check in DataFrame
-            return len(self.data[self.data['HSNCode'].astype(str) == hsn_code]) > 0
-        
-        elif self.source_type == "json" and self.data is not None:
-            # Check in JSON data
-            return any(item['hsn_code'] == hsn_code for item in self.data)
+        elif self.source_type in ("csv", "json", "snapshot") and self.index is not None:
+            return hsn_code in self.index
         
         return False
     
@@ -140,4 +440,7 @@ class HSNDataLoader:
         Close any open connections.
         """
         if self.source_type == "database" and self.db:
-            self.db.close()
\ No newline at end of file
+            self.db.close()
+        
+        elif self.source_type == "snapshot" and self.index is not None:
+            self.index.close()
\ No newline at end of file
@@ -1,40 +1,131 @@
 import sqlite3
-import pandas as pd
+import csv
+import hashlib
+import itertools
 import os
+import re
+import threading
+import time
+import weakref
+from urllib.parse import quote
+from code_index import HSNHierarchy
+from records import HSNRecord
+
+# Columns of the hsn_codes table. Codes are made unique by the idx_hsn_code
+# index rather than an inline constraint, so bulk loads can fill a copy of
+# the table without it and build the index once afterwards.
+CODES_TABLE_COLUMNS = '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hsn_code TEXT NOT NULL,
+            description TEXT NOT NULL,
+            parent_code TEXT,
+            level INTEGER
+'''
 
 class HSNDatabase:
     """
     Database handler for HSN codes using SQLite.
     Provides methods for creating, populating, and querying the database.
+    
+    In read-only mode every thread gets its own read-only connection
+    (mode=ro, query_only) from a small pool, so one instance can be shared
+    by a thread-pool server and concurrent reads are not serialized.
     """
     
-    def __init__(self, db_path="hsn_codes.db"):
+    def __init__(self, db_path="hsn_codes.db", read_only=False):
         """
         Initialize the database connection.
         
         Args:
             db_path (str): Path to the SQLite database file
+            read_only (bool): Use pooled, per-thread read-only connections
         """
         self.db_path = db_path
+        self.read_only = read_only
         self.conn = None
         self.cursor = None
+        self._has_fts = None
+        self._has_hierarchy = None
+        self._local = threading.local()
+        # Open read-only connections, each mapped to the finalizer that closes it
+        self._pool = {}
+        self._pool_lock = threading.Lock()
+        
+        # Optional Metrics instance; instrumentation is off when None
+        self.metrics = None
     
     def connect(self):
         """
         Connect to the database.
+        
+        In read-only mode this returns the calling thread's read-only connection.
         """
-        self.conn = sqlite3.connect(self.db_path)
+        if self.read_only:
+            return self._read_connection()
+        
+        start = time.perf_counter()
+        self.conn = sqlite3.connect(self.db_path, cached_statements=256)
         self.cursor = self.conn.cursor()
+        if self.metrics is not None:
+            self.metrics.increment('db_connects')
+            self.metrics.observe('db_connect', time.perf_counter() - start)
         return self.conn
     
+    def _read_connection(self):
+        """
+        Get the connection used for queries by the calling thread.
+        """
+        if not self.read_only:
+            if not self.conn:
+                self.connect()
+            return self.conn
+        
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            start = time.perf_counter()
+            path = os.path.abspath(self.db_path).replace(os.sep, '/')
+            if not path.startswith('/'):
+                # Windows drive letter: file:///C:/...
+                path = '/' + path
+            uri = f"file://{quote(path, safe='/:')}?mode=ro"
+            # Statements are cached per connection, so repeated queries skip re-preparing
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA query_only = 1")
+            
+            # The owner lives in the thread's local storage, so the connection
+            # is closed when the thread exits and the pool never outgrows the
+            # threads still running
+            owner = _ConnectionOwner(conn)
+            with self._pool_lock:
+                self._pool[conn] = weakref.finalize(owner, _close_pooled, self._pool, self._pool_lock, conn)
+            self._local.owner = owner
+            if self.metrics is not None:
+                self.metrics.increment('db_connects')
+                self.metrics.observe('db_connect', time.perf_counter() - start)
+        return owner.conn
+    
+    def _record_query(self, name, start, rows):
+        """
+        Record a query's latency and row count when instrumentation is on.
+        """
+        self.metrics.increment('db_queries')
+        self.metrics.increment('db_rows_fetched', rows)
+        self.metrics.observe(f'db_{name}', time.perf_counter() - start)
+    
     def close(self):
         """
-        Close the database connection.
+        Close the database connection and any pooled read-only connections.
         """
         if self.conn:
             self.conn.close()
             self.conn = None
             self.cursor = None
+        
+        with self._pool_lock:
+            finalizers = list(self._pool.values())
+        for finalizer in finalizers:
+            finalizer()
+        self._local = threading.local()
     
     def create_tables(self):
         """
@@ -43,29 +134,200 @@ class HSNDatabase:
         if not self.conn:
             self.connect()
         
+        # WAL lets readers keep reading while the database is being written
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        
         # Create HSN codes table
+        self.cursor.execute(f"CREATE TABLE IF NOT EXISTS hsn_codes ({CODES_TABLE_COLUMNS})")
+        
+        # Precomputed hierarchy: databases created before it get the columns added
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_info(hsn_codes)")}
+        if 'parent_code' not in columns:
+            self.cursor.execute("ALTER TABLE hsn_codes ADD COLUMN parent_code TEXT")
+        if 'level' not in columns:
+            self.cursor.execute("ALTER TABLE hsn_codes ADD COLUMN level INTEGER")
+        
+        # Databases created with an inline UNIQUE(hsn_code) also had a second,
+        # redundant index on hsn_code; they keep the constraint's own index
+        unique = {row[1]: row[2] for row in self.cursor.execute("PRAGMA index_list(hsn_codes)")}
+        if unique.get('idx_hsn_code') == 0:
+            self.cursor.execute("DROP INDEX idx_hsn_code")
+            del unique['idx_hsn_code']
+        if not any(unique.values()):
+            self.cursor.execute("CREATE UNIQUE INDEX idx_hsn_code ON hsn_codes(hsn_code)")
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_hsn_parent ON hsn_codes(parent_code, hsn_code)
+        ''')
+        
+        # Closure table: one row per (ancestor, descendant) pair, including each code itself at depth 0
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hsn_closure (
+            ancestor TEXT NOT NULL,
+            descendant TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor, depth, descendant)
+        ) WITHOUT ROWID
+        ''')
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_closure_descendant ON hsn_closure(descendant, depth)
+        ''')
+        
+        # Dataset metadata (e.g. the dataset version bumped by every load or update)
         self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS hsn_codes (
+        CREATE TABLE IF NOT EXISTS hsn_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        ''')
+        
+        # Change log of incremental updates
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hsn_changelog (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            version INTEGER NOT NULL,
+            change_type TEXT NOT NULL,
             hsn_code TEXT NOT NULL,
-            description TEXT NOT NULL,
-            UNIQUE(hsn_code)
+            old_description TEXT,
+            new_description TEXT,
+            changed_at TEXT NOT NULL
         )
         ''')
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_changelog_version ON hsn_changelog(version)
+        ''')
         
-        # Create index for faster searches
+        # Create full-text index over descriptions (external content table)
         self.cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_hsn_code ON hsn_codes(hsn_code)
+        CREATE VIRTUAL TABLE IF NOT EXISTS hsn_codes_fts USING fts5(
+            description,
+            content='hsn_codes',
+            content_rowid='id',
+            prefix='2 3'
+        )
         ''')
         
         self.conn.commit()
+        self._has_fts = True
+        self._has_hierarchy = True
+    
+    def rebuild_fts(self):
+        """
+        Rebuild the full-text index from the hsn_codes table.
+        """
+        if not self.conn:
+            self.connect()
+        
+        self.cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts) VALUES('rebuild')")
+        self.conn.commit()
+    
+    def rebuild_hierarchy(self):
+        """
+        Recompute parent codes, levels and the closure table from the hsn_codes table.
+        
+        Returns:
+            int: Number of codes in the hierarchy
+        """
+        if not self.conn:
+            self.connect()
+        
+        count = self._write_hierarchy(self.cursor)
+        self.conn.commit()
+        return count
+    
+    def _write_hierarchy(self, cursor, changed_codes=None):
+        """
+        Write the hierarchy of the current codes without committing.
+        
+        With changed_codes (codes just inserted or deleted), only the rows of
+        those codes and of the codes under them are rewritten; every other
+        code keeps its ancestors.
+        """
+        hierarchy = HSNHierarchy(row[0] for row in cursor.execute("SELECT hsn_code FROM hsn_codes"))
+        if changed_codes is None:
+            affected = hierarchy.sorted_codes
+            cursor.execute("DELETE FROM hsn_closure")
+        else:
+            affected = set()
+            for code in changed_codes:
+                affected.update(hierarchy.descendants_by_prefix(code))
+            cursor.executemany("DELETE FROM hsn_closure WHERE descendant = ?",
+                               ((code,) for code in affected.union(changed_codes)))
+            affected.update(code for code in changed_codes if code in hierarchy)
+            affected = sorted(affected)
+        
+        cursor.executemany(
+            "UPDATE hsn_codes SET parent_code = ?, level = ? WHERE hsn_code = ?",
+            ((hierarchy.parent[code], hierarchy.level[code], code) for code in affected)
+        )
+        cursor.executemany(
+            "INSERT INTO hsn_closure (ancestor, descendant, depth) VALUES (?, ?, ?)",
+            hierarchy.closure(affected)
+        )
+        return len(affected)
+    
+    def has_hierarchy(self):
+        """
+        Check whether the database has the precomputed hierarchy.
+        
+        Returns:
+            bool: True if the closure table exists, False otherwise
+        """
+        if self._has_hierarchy is None:
+            cursor = self._read_connection().execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'hsn_closure'"
+            )
+            self._has_hierarchy = cursor.fetchone()[0] > 0
+        return self._has_hierarchy
     
-    def load_data_from_csv(self, csv_path):
+    def has_fts(self):
+        """
+        Check whether the database has the full-text description index.
+        
+        Returns:
+            bool: True if the FTS5 table exists, False otherwise
+        """
+        if self._has_fts is None:
+            cursor = self._read_connection().execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'hsn_codes_fts'"
+            )
+            self._has_fts = cursor.fetchone()[0] > 0
+        return self._has_fts
+    
+    def load_data_from_csv(self, csv_path, batch_size=50000):
         """
         Load HSN codes from a CSV file into the database.
         
+        The file is streamed through bulk_load, so the full-text index and
+        the hierarchy are rebuilt once after all rows are inserted instead
+        of being maintained row by row.
+        
         Args:
             csv_path (str): Path to the CSV file containing HSN codes
+            batch_size (int): Number of rows sent to SQLite per executemany call
+        
+        Returns:
+            int: Number of records inserted
+        """
+        return self.bulk_load(iter_csv_records(csv_path), batch_size)
+    
+    def bulk_load(self, records, batch_size=50000):
+        """
+        Load HSN codes from any iterable of records into the database.
+        
+        The records are consumed lazily in batches with executemany into an
+        index-free temporary staging table. The codes already in the
+        database and the staged ones (the last record of a repeated code
+        wins, as with INSERT OR REPLACE) are then copied in code order into
+        a new table, the unique code index is built on it once, and it
+        replaces hsn_codes. The copy, the swap and the rebuild of the
+        full-text index and the hierarchy happen in a single transaction
+        with the database's normal durability settings, so a failing or
+        interrupted load leaves the database unchanged. Load statistics
+        are kept in ``last_load_stats``.
+        
+        Args:
+            records (iterable): Iterable of (hsn_code, description) tuples
+            batch_size (int): Number of rows sent to SQLite per executemany call
         
         Returns:
             int: Number of records inserted
@@ -76,28 +338,250 @@ class HSNDatabase:
         # Create tables if they don't exist
         self.create_tables()
         
-        # Read CSV file
-        df = pd.read_csv(csv_path)
-        
-        # Ensure column names are correct
-        if '\nHSNCode' in df.columns:
-            df = df.rename(columns={'\nHSNCode': 'HSNCode'})
-        
-        # Insert data into database
-        records = 0
-        for _, row in df.iterrows():
-            try:
-                self.cursor.execute(
-                    "INSERT OR REPLACE INTO hsn_codes (hsn_code, description) VALUES (?, ?)",
-                    (str(row['HSNCode']).strip(), str(row['Description']).strip())
-                )
-                records += 1
-            except Exception as e:
-                print(f"Error inserting record: {e}")
+        start_time = time.perf_counter()
+        # The staging table lives in the connection's temporary database, not in the database file
+        self.cursor.execute("PRAGMA temp_store = MEMORY")
+        self.cursor.execute("PRAGMA cache_size = -65536")
+        try:
+            self.cursor.execute("BEGIN")
+            self.cursor.execute("CREATE TEMP TABLE hsn_codes_staging (hsn_code TEXT NOT NULL, description TEXT NOT NULL)")
+            records = self._insert_batches(self.cursor, records, batch_size, "temp.hsn_codes_staging")
+            self._swap_in_staged_codes(self.cursor)
+            # Refresh the full-text index and the hierarchy to match the new rows
+            self.cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts) VALUES('rebuild')")
+            self._write_hierarchy(self.cursor)
+            self._set_dataset_version(self.cursor, self.get_dataset_version() + 1)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cursor.execute("DROP TABLE IF EXISTS temp.hsn_codes_staging")
         
-        self.conn.commit()
+        elapsed = time.perf_counter() - start_time
+        self.last_load_stats = {
+            'records': records,
+            'seconds': elapsed,
+            'rows_per_second': records / elapsed if elapsed > 0 else 0.0
+        }
         return records
     
+    def insert_records(self, records, batch_size=50000):
+        """
+        Insert or replace HSN codes in batches and commit.
+        
+        Args:
+            records (iterable): Iterable of (hsn_code, description) tuples
+            batch_size (int): Number of rows sent to SQLite per executemany call
+        
+        Returns:
+            int: Number of records inserted
+        """
+        if not self.conn:
+            self.connect()
+        
+        total = self._insert_batches(self.cursor, records, batch_size)
+        self.conn.commit()
+        return total
+    
+    def _insert_batches(self, cursor, records, batch_size, table="hsn_codes"):
+        """
+        Insert or replace records into a table in batches without committing.
+        """
+        total = 0
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                break
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {table} (hsn_code, description) VALUES (?, ?)",
+                batch
+            )
+            total += len(batch)
+        return total
+    
+    def _swap_in_staged_codes(self, cursor):
+        """
+        Replace hsn_codes with a copy merging in the staged records, without committing.
+        """
+        cursor.execute(f"CREATE TABLE hsn_codes_new ({CODES_TABLE_COLUMNS})")
+        cursor.execute('''
+        INSERT INTO hsn_codes_new (hsn_code, description)
+        SELECT hsn_code, description FROM hsn_codes
+        WHERE hsn_code NOT IN (SELECT hsn_code FROM temp.hsn_codes_staging)
+        UNION ALL
+        SELECT hsn_code, description FROM temp.hsn_codes_staging
+        WHERE rowid IN (SELECT MAX(rowid) FROM temp.hsn_codes_staging GROUP BY hsn_code)
+        ORDER BY hsn_code
+        ''')
+        cursor.execute("DROP TABLE hsn_codes")
+        cursor.execute("ALTER TABLE hsn_codes_new RENAME TO hsn_codes")
+        cursor.execute("CREATE UNIQUE INDEX idx_hsn_code ON hsn_codes(hsn_code)")
+        cursor.execute("CREATE INDEX idx_hsn_parent ON hsn_codes(parent_code, hsn_code)")
+    
+    def update_from_csv(self, csv_path, dry_run=False):
+        """
+        Apply a new cleaned CSV to the database as an incremental update.
+        
+        Args:
+            csv_path (str): Path to the new cleaned CSV file
+            dry_run (bool): Only compute the differences, without writing
+        
+        Returns:
+            dict: Counts of inserted, updated and deleted codes, and the dataset version
+        """
+        return self.apply_update(iter_csv_records(csv_path), dry_run)
+    
+    def apply_update(self, records, dry_run=False):
+        """
+        Bring the database in line with a new full set of records.
+        
+        The records are diffed against the database by code and a hash of
+        the description, and only the inserted, updated and deleted codes
+        are written, in a single transaction together with the matching
+        full-text index entries, the affected part of the hierarchy, one
+        change log row per change and a dataset version bump. Unchanged
+        rows and their pages are not touched.
+        
+        Args:
+            records (iterable): Iterable of (hsn_code, description) tuples for the whole new catalog
+            dry_run (bool): Only compute the differences, without writing
+        
+        Returns:
+            dict: Counts of inserted, updated and deleted codes, the dataset version and elapsed seconds
+        """
+        if not self.conn:
+            self.connect()
+        start_time = time.perf_counter()
+        
+        # Tables missing from databases created by older versions are added
+        # below and then filled in full once, instead of incrementally
+        full_rebuild = not (self.has_fts() and self.has_hierarchy())
+        if not dry_run:
+            self.create_tables()
+        
+        current = {hsn_code: content_hash(description) for hsn_code, description
+                   in self.cursor.execute("SELECT hsn_code, description FROM hsn_codes")}
+        changed = {}
+        present = set()
+        for hsn_code, description in records:
+            present.add(hsn_code)
+            if current.get(hsn_code) == content_hash(description):
+                # A later duplicate row can restore the current description
+                changed.pop(hsn_code, None)
+            else:
+                changed[hsn_code] = description
+        
+        inserts = sorted(hsn_code for hsn_code in changed if hsn_code not in current)
+        updates = sorted(hsn_code for hsn_code in changed if hsn_code in current)
+        deletes = sorted(hsn_code for hsn_code in current if hsn_code not in present)
+        summary = {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deletes)}
+        
+        if dry_run or not (inserts or updates or deletes):
+            summary['version'] = self.get_dataset_version()
+            summary['seconds'] = time.perf_counter() - start_time
+            return summary
+        
+        version = self.get_dataset_version() + 1
+        changed_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        log = []
+        
+        # The connection context manager commits on success and rolls back on error
+        with self.conn:
+            cursor = self.conn.cursor()
+            for hsn_code in deletes:
+                row_id, old_description = cursor.execute(
+                    "SELECT id, description FROM hsn_codes WHERE hsn_code = ?", (hsn_code,)).fetchone()
+                if not full_rebuild:
+                    cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts, rowid, description) VALUES('delete', ?, ?)",
+                                   (row_id, old_description))
+                cursor.execute("DELETE FROM hsn_codes WHERE id = ?", (row_id,))
+                log.append((version, 'delete', hsn_code, old_description, None, changed_at))
+            
+            for hsn_code in updates:
+                description = changed[hsn_code]
+                row_id, old_description = cursor.execute(
+                    "SELECT id, description FROM hsn_codes WHERE hsn_code = ?", (hsn_code,)).fetchone()
+                if not full_rebuild:
+                    cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts, rowid, description) VALUES('delete', ?, ?)",
+                                   (row_id, old_description))
+                    cursor.execute("INSERT INTO hsn_codes_fts(rowid, description) VALUES (?, ?)", (row_id, description))
+                cursor.execute("UPDATE hsn_codes SET description = ? WHERE id = ?", (description, row_id))
+                log.append((version, 'update', hsn_code, old_description, description, changed_at))
+            
+            for hsn_code in inserts:
+                description = changed[hsn_code]
+                cursor.execute("INSERT INTO hsn_codes (hsn_code, description) VALUES (?, ?)", (hsn_code, description))
+                if not full_rebuild:
+                    cursor.execute("INSERT INTO hsn_codes_fts(rowid, description) VALUES (?, ?)",
+                                   (cursor.lastrowid, description))
+                log.append((version, 'insert', hsn_code, None, description, changed_at))
+            
+            if full_rebuild:
+                cursor.execute("INSERT INTO hsn_codes_fts(hsn_codes_fts) VALUES('rebuild')")
+                self._write_hierarchy(cursor)
+            else:
+                # Only inserted and deleted codes can change anyone's ancestors
+                self._write_hierarchy(cursor, inserts + deletes)
+            
+            cursor.executemany(
+                """
+                INSERT INTO hsn_changelog (version, change_type, hsn_code, old_description, new_description, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                log
+            )
+            self._set_dataset_version(cursor, version)
+        
+        summary['version'] = version
+        summary['seconds'] = time.perf_counter() - start_time
+        return summary
+    
+    def get_dataset_version(self):
+        """
+        Get the dataset version, bumped by every bulk load and applied update.
+        
+        Returns:
+            int: Dataset version, 0 for databases that have never recorded one
+        """
+        try:
+            row = self._read_connection().execute(
+                "SELECT value FROM hsn_meta WHERE key = 'dataset_version'").fetchone()
+        except sqlite3.OperationalError:
+            # Databases created before versioning have no metadata table
+            return 0
+        return int(row[0]) if row else 0
+    
+    def _set_dataset_version(self, cursor, version):
+        cursor.execute("INSERT OR REPLACE INTO hsn_meta (key, value) VALUES ('dataset_version', ?)", (str(version),))
+    
+    def get_changes(self, since_version=0):
+        """
+        Get the change log entries recorded after a dataset version.
+        
+        Args:
+            since_version (int): Only return changes made in later versions
+        
+        Returns:
+            list: Change records in the order they were applied
+        """
+        cursor = self._read_connection().execute(
+            """
+            SELECT version, change_type, hsn_code, old_description, new_description, changed_at
+            FROM hsn_changelog WHERE version > ? ORDER BY id
+            """,
+            (since_version,)
+        )
+        return [{
+            'version': row[0],
+            'change_type': row[1],
+            'hsn_code': row[2],
+            'old_description': row[3],
+            'new_description': row[4],
+            'changed_at': row[5]
+        } for row in cursor.fetchall()]
+    
     def search_by_code(self, hsn_code):
         """
         Search for HSN codes by exact code or prefix.
@@ -106,52 +590,176 @@ class HSNDatabase:
             hsn_code (str): HSN code to search for
         
         Returns:
-            list: List of matching records as dictionaries
+            list: List of matching HSNRecord objects
         """
-        if not self.conn:
-            self.connect()
+        conn = self._read_connection()
+        start = time.perf_counter() if self.metrics is not None else 0.0
         
-        # Search for exact match or prefix match
-        self.cursor.execute(
-            "SELECT hsn_code, description FROM hsn_codes WHERE hsn_code = ? OR hsn_code LIKE ?",
-            (hsn_code, f"{hsn_code}%")
+        # Exact or prefix match as a range over the code index, instead of a LIKE scan
+        cursor = conn.execute(
+            "SELECT hsn_code, description FROM hsn_codes WHERE hsn_code >= ? AND hsn_code < ? ORDER BY hsn_code",
+            (hsn_code, hsn_code + '\uffff')
         )
         
-        results = []
-        for row in self.cursor.fetchall():
-            results.append({
-                'hsn_code': row[0],
-                'description': row[1]
-            })
+        results = [HSNRecord(row[0], row[1]) for row in cursor.fetchall()]
         
+        if self.metrics is not None:
+            self._record_query('search_by_code', start, len(results))
         return results
     
-    def search_by_description(self, description):
+    def get_parents(self, hsn_code):
         """
-        Search for HSN codes by description (case-insensitive).
+        Get the ancestors of an HSN code from the closure table.
         
         Args:
-            description (str): Description to search for
+            hsn_code (str): HSN code to get the ancestors of
         
         Returns:
-            list: List of matching records as dictionaries
+            list: List of ancestor records, broadest first
         """
-        if not self.conn:
-            self.connect()
+        return self._query_records(
+            'get_parents',
+            """
+            SELECT h.hsn_code, h.description
+            FROM hsn_closure c
+            JOIN hsn_codes h ON h.hsn_code = c.ancestor
+            WHERE c.descendant = ? AND c.depth > 0
+            ORDER BY c.depth DESC
+            """,
+            (hsn_code,)
+        )
+    
+    def get_children(self, hsn_code=None):
+        """
+        Get the direct children of an HSN code.
+        
+        Args:
+            hsn_code (str): Parent HSN code. None for the top-level codes
         
-        # Search for description (case-insensitive)
-        self.cursor.execute(
-            "SELECT hsn_code, description FROM hsn_codes WHERE LOWER(description) LIKE LOWER(?)",
-            (f"%{description}%",)
+        Returns:
+            list: List of child records ordered by code
+        """
+        if hsn_code is None:
+            return self._query_records(
+                'get_children',
+                "SELECT hsn_code, description FROM hsn_codes WHERE parent_code IS NULL ORDER BY hsn_code",
+                ()
+            )
+        return self._query_records(
+            'get_children',
+            "SELECT hsn_code, description FROM hsn_codes WHERE parent_code = ? ORDER BY hsn_code",
+            (hsn_code,)
+        )
+    
+    def get_subtree(self, hsn_code, depth=None):
+        """
+        Get the descendants of an HSN code from the closure table.
+        
+        Args:
+            hsn_code (str): Root of the subtree
+            depth (int): Maximum number of levels below the root. If None, all levels
+        
+        Returns:
+            list: Records with 'parent_code' and 'depth' below the root, ordered by code
+        """
+        conn = self._read_connection()
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        cursor = conn.execute(
+            """
+            SELECT h.hsn_code, h.description, h.parent_code, c.depth
+            FROM hsn_closure c
+            JOIN hsn_codes h ON h.hsn_code = c.descendant
+            WHERE c.ancestor = ? AND c.depth BETWEEN 1 AND ?
+            ORDER BY h.hsn_code
+            """,
+            # SQLite integers are 64-bit, so this bound means "no limit"
+            (hsn_code, depth if depth is not None else 2 ** 62)
         )
         
         results = []
-        for row in self.cursor.fetchall():
+        for row in cursor.fetchall():
             results.append({
                 'hsn_code': row[0],
-                'description': row[1]
+                'description': row[1],
+                'parent_code': row[2],
+                'depth': row[3]
             })
         
+        if self.metrics is not None:
+            self._record_query('get_subtree', start, len(results))
+        return results
+    
+    def _query_records(self, name, sql, params):
+        """
+        Run a query returning (hsn_code, description) rows as records.
+        """
+        conn = self._read_connection()
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        results = [HSNRecord(row[0], row[1]) for row in conn.execute(sql, params)]
+        if self.metrics is not None:
+            self._record_query(name, start, len(results))
+        return results
+    
+    def iter_records(self):
+        """
+        Iterate over all HSN codes in the database.
+        
+        Returns:
+            iterator: Iterator of (hsn_code, description) tuples
+        """
+        conn = self._read_connection()
+        if self.metrics is not None:
+            self.metrics.increment('db_queries')
+        return conn.execute("SELECT hsn_code, description FROM hsn_codes")
+    
+    def search_by_description(self, description, limit=None, offset=0):
+        """
+        Search for HSN codes by description.
+        
+        Uses the FTS5 index when available: every token in the query must
+        match, a trailing '*' makes a token a prefix match, and results are
+        ranked by BM25. Databases without the index fall back to a
+        case-insensitive substring search.
+        
+        Args:
+            description (str): Description to search for, e.g. 'live hors*'
+            limit (int): Maximum number of results. If None, all results are returned
+            offset (int): Number of results to skip
+        
+        Returns:
+            list: List of matching HSNRecord objects
+        """
+        conn = self._read_connection()
+        limit = -1 if limit is None else limit
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        
+        if self.has_fts():
+            match = fts_query(description)
+            if not match:
+                return []
+            cursor = conn.execute(
+                """
+                SELECT h.hsn_code, h.description
+                FROM hsn_codes_fts
+                JOIN hsn_codes h ON h.id = hsn_codes_fts.rowid
+                WHERE hsn_codes_fts MATCH ?
+                ORDER BY bm25(hsn_codes_fts), h.hsn_code
+                LIMIT ? OFFSET ?
+                """,
+                (match, limit, offset)
+            )
+        else:
+            # Search for description (case-insensitive), ignoring prefix markers
+            cursor = conn.execute(
+                "SELECT hsn_code, description FROM hsn_codes WHERE LOWER(description) LIKE LOWER(?) LIMIT ? OFFSET ?",
+                (f"%{description.replace('*', '')}%", limit, offset)
+            )
+        
+        results = [HSNRecord(row[0], row[1]) for row in cursor.fetchall()]
+        
+        if self.metrics is not None:
+            self._record_query('search_by_description_fts' if self._has_fts else 'search_by_description_like',
+                               start, len(results))
         return results
     
     def is_valid_hsn_code(self, hsn_code):
@@ -164,13 +772,91 @@ class HSNDatabase:
         Returns:
             bool: True if valid, False otherwise
         """
-        if not self.conn:
-            self.connect()
-        
-        self.cursor.execute(
+        conn = self._read_connection()
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        cursor = conn.execute(
             "SELECT COUNT(*) FROM hsn_codes WHERE hsn_code = ?",
             (hsn_code,)
         )
         
-        count = self.cursor.fetchone()[0]
-        return count > 0
\ No newline at end of file
+        count = cursor.fetchone()[0]
+        if self.metrics is not None:
+            self._record_query('is_valid_hsn_code', start, 1)
+        return count > 0
+
+def fts_query(description):
+    """
+    Build an FTS5 MATCH expression from free text.
+    
+    Each alphanumeric token is quoted so FTS5 syntax in user input is not
+    interpreted; a trailing '*' on a token is kept as a prefix match.
+    
+    Args:
+        description (str): Free-text search query
+    
+    Returns:
+        str: FTS5 query string, empty if the text has no tokens
+    """
+    terms = []
+    for token in re.findall(r'[^\W_]+\*?', description):
+        if token.endswith('*'):
+            terms.append(f'"{token[:-1]}"*')
+        else:
+            terms.append(f'"{token}"')
+    return ' '.join(terms)
+
+def content_hash(description):
+    """
+    Hash a description for change detection.
+    
+    Args:
+        description (str): Record description
+    
+    Returns:
+        bytes: 8-byte BLAKE2b digest
+    """
+    return hashlib.blake2b(description.encode('utf-8'), digest_size=8).digest()
+
+class _ConnectionOwner:
+    """
+    Holder of one thread's read-only connection, kept in thread-local storage.
+    """
+    
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn):
+        self.conn = conn
+
+def _close_pooled(pool, pool_lock, conn):
+    """
+    Close a pooled connection and forget it, when its thread exits or the database is closed.
+    """
+    with pool_lock:
+        pool.pop(conn, None)
+    conn.close()
+
+def iter_csv_records(csv_path):
+    """
+    Stream HSN codes from a cleaned CSV file.
+    
+    Codes are kept as strings so leading zeros are preserved. Rows without
+    a code are skipped.
+    
+    Args:
+        csv_path (str): Path to the CSV file with HSNCode and Description columns
+    
+    Yields:
+        tuple: (hsn_code, description) pairs
+    """
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader, [])]
+        code_col = header.index('HSNCode')
+        desc_col = header.index('Description')
+        
+        for row in reader:
+            if len(row) <= max(code_col, desc_col):
+                continue
+            hsn_code = row[code_col].strip()
+            if hsn_code:
+                yield hsn_code, row[desc_col].strip()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import re
+
+# Candidate HSN codes in text: bare 2-8 digit numbers, or a 4-digit heading
+# followed by 2-digit groups separated by dots or spaces (0101.10.10,
+# 8542 31 00). Digits that are part of a word (10kg, INV01011010), a longer
+# number, a decimal amount (1,234.56), a thousands-separated figure, a
+# signed number or dialling code (+91), a date (2024-05-15, 15/05/2024) or
+# a range never start or end a candidate. An 'HSN-' label is the one
+# prefix a code may be hyphenated to (HSN-01011010).
+CANDIDATE_PATTERN = re.compile(
+    r'(?:(?<=[Hh][Ss][Nn]-)|(?<![\w.,/+-]))(?:\d{4}(?:[. ]\d{2}){1,2}|\d{2,8})(?![\w/-]|[.,]\d)'
+)
+
+# Characters of context the pattern looks behind a candidate for
+STREAM_LOOKBEHIND = 4
+
+# Characters held back at the end of a chunk, longer than any candidate
+STREAM_OVERLAP = 32
+
+class HSNCodeExtractor:
+    """
+    Recognizer for HSN codes in text, backed by the catalog index.
+
+    Candidates are found in one regex pass over the text and each one is
+    resolved with a few exact lookups of its digit prefixes in the catalog
+    index, so numbers that cannot be HSN codes (dates, amounts, phone
+    fragments) are rejected without any validation work. Nothing is built
+    beyond the index itself, so a memory-mapped snapshot stays shared
+    between processes. A candidate is accepted as:
+
+    - the whole normalized code, if it is in the catalog;
+    - for space-separated groups short of a full 8-digit code, the longest
+      run of leading groups that is a catalog code ('0101 10 units' ->
+      '0101');
+    - otherwise the whole normalized code if a catalog heading (4 digits
+      or more) is a prefix of it, so mistyped codes under a known heading
+      are still reported, as invalid.
+    """
+
+    SEPARATORS = re.compile(r'[. ]')
+
+    def __init__(self, index):
+        """
+        Initialize the extractor.
+
+        Args:
+            index: Catalog index supporting 'code in index' (HSNCodeIndex,
+                HSNArrayIndex or HSNSnapshot)
+        """
+        self.index = index
+
+    def resolve(self, token):
+        """
+        Resolve a candidate token to the HSN code it stands for.
+
+        Args:
+            token (str): Text matched by CANDIDATE_PATTERN
+
+        Returns:
+            tuple: (normalized code, number of token characters it spans), or None if the token is not a code
+        """
+        if len(token) <= 8 and token.isdigit():
+            groups = [token]
+            digits = token
+        else:
+            groups = self.SEPARATORS.split(token)
+            digits = ''.join(groups)
+
+        index = self.index
+        if digits in index:
+            return digits, len(token)
+
+        # Spaces are ambiguous unless all groups are there: '0101 10 units'
+        # is heading 0101 followed by a quantity
+        if ' ' in token and len(digits) < 8:
+            for count in range(len(groups) - 1, 0, -1):
+                length = sum(len(group) for group in groups[:count])
+                if digits[:length] in index:
+                    # Each separator before the last kept group is one character
+                    return digits[:length], length + count - 1
+
+        # A mistyped code under a known heading, or a narrower known code
+        for length in range(len(digits) - 1, 3, -1):
+            if digits[:length] in index:
+                return digits, len(token)
+        return None
+
+    def finditer(self, text):
+        """
+        Find the HSN codes in a text.
+
+        Args:
+            text (str): Text to search
+
+        Yields:
+            tuple: (normalized code, start offset, end offset)
+        """
+        for match in CANDIDATE_PATTERN.finditer(text):
+            resolved = self.resolve(match.group())
+            if resolved is not None:
+                code, length = resolved
+                yield code, match.start(), match.start() + length
@@ -0,0 +1,143 @@
+import itertools
+import json
+import os
+
+LAYOUTS = ("jsonl", "chapters")
+
+def export_json(records, json_path, layout="jsonl"):
+    """
+    Write HSN codes as JSON.
+
+    Layouts:
+        jsonl     one {"hsn_code", "description"} object per line
+        chapters  a JSON array with one group per 2-digit chapter:
+                  {"chapter", "description", "codes": [{"hsn_code", "description"}, ...]}
+                  where "description" is the chapter's own description (null
+                  if the chapter code is not in the catalog) and "codes" holds
+                  the longer codes under it
+
+    Both layouts are read back by iter_json_records. The file is written to
+    a temporary path and moved into place.
+
+    Args:
+        records (iterable): Iterable of (hsn_code, description) pairs
+        json_path (str): Path of the JSON file to write
+        layout (str): 'jsonl' or 'chapters'
+
+    Returns:
+        int: Number of records written
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown JSON layout '{layout}'. Expected one of: {', '.join(LAYOUTS)}")
+
+    catalog = {}
+    for hsn_code, description in records:
+        catalog[str(hsn_code).strip()] = str(description).strip()
+    codes = sorted(catalog)
+
+    tmp_path = json_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if layout == "jsonl":
+            for hsn_code in codes:
+                f.write(json.dumps({'hsn_code': hsn_code, 'description': catalog[hsn_code]}, ensure_ascii=False))
+                f.write('\n')
+        else:
+            f.write('[\n')
+            for i, (chapter, chapter_codes) in enumerate(itertools.groupby(codes, key=lambda code: code[:2])):
+                group = {
+                    'chapter': chapter,
+                    'description': catalog.get(chapter),
+                    'codes': [{'hsn_code': hsn_code, 'description': catalog[hsn_code]}
+                              for hsn_code in chapter_codes if hsn_code != chapter]
+                }
+                if i:
+                    f.write(',\n')
+                f.write(json.dumps(group, ensure_ascii=False))
+            f.write('\n]\n')
+    os.replace(tmp_path, json_path)
+    return len(codes)
+
+def iter_json_records(json_path, chunk_size=1 << 16):
+    """
+    Stream (hsn_code, description) pairs from a JSON catalog.
+
+    Accepts JSON Lines, a JSON array of records and the chapter-grouped
+    layout written by export_json. Arrays are decoded one element at a
+    time, so memory is bounded by the largest element rather than the
+    whole document.
+
+    Args:
+        json_path (str): Path of the JSON file
+        chunk_size (int): Number of characters read at a time
+
+    Yields:
+        tuple: (hsn_code, description)
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip('\ufeff \t\r\n')
+        if buffer.startswith('['):
+            items = _iter_array_items(f, buffer[1:], chunk_size)
+        else:
+            items = _iter_lines(f, buffer)
+
+        for item in items:
+            if 'codes' in item:
+                if item.get('description') is not None:
+                    yield item['chapter'], item['description']
+                for record in item['codes']:
+                    yield record['hsn_code'], record['description']
+            else:
+                yield item['hsn_code'], item['description']
+
+def _iter_lines(f, buffer):
+    """
+    Decode one JSON object per non-empty line.
+    """
+    for line in itertools.chain(_split_first_lines(f, buffer), f):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def _split_first_lines(f, buffer):
+    """
+    Yield the complete lines of an already-read buffer, joining the partial
+    last line with the rest of its line from the file.
+    """
+    lines = buffer.split('\n')
+    for line in lines[:-1]:
+        yield line
+    yield lines[-1] + f.readline()
+
+def _iter_array_items(f, buffer, chunk_size):
+    """
+    Decode the elements of a JSON array incrementally, reading more of the
+    file only when the buffered text does not hold a complete element.
+    """
+    decoder = json.JSONDecoder()
+    pos = 0
+    eof = False
+    while True:
+        # Skip whitespace and the separator before the next element
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        if pos < len(buffer):
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON array")
+
+        # Element incomplete: drop consumed text and read at least as much again
+        more = f.read(max(chunk_size, len(buffer) - pos))
+        eof = not more
+        buffer = buffer[pos:] + more
+        pos = 0
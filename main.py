@@ -1,9 +1,16 @@
 import argparse
+import contextlib
+import csv
+import json
 import os
 import sys
-from data_cleaning import clean_hsn_data
+import time
 from database import HSNDatabase
 from agent import HSNCodeAgent
+from data_loader import HSNDataLoader
+from snapshot import compile_snapshot
+from json_catalog import export_json, LAYOUTS
+from records import json_default
 
 def setup_database():
     """
@@ -19,8 +26,11 @@ def setup_database():
     
     # Clean the data if needed
     if not os.path.exists(cleaned_file):
+        # pandas is only needed for cleaning, so import it lazily
+        from data_cleaning import clean_hsn_data_streaming
+
         print("Cleaning HSN codes data...")
-        clean_hsn_data(input_file, cleaned_file)
+        clean_hsn_data_streaming(input_file, cleaned_file)
     
     # Create and populate the database
     print("Setting up the database...")
@@ -28,11 +38,72 @@ def setup_database():
     db.connect()
     db.create_tables()
     records = db.load_data_from_csv(cleaned_file)
+    stats = db.last_load_stats
     db.close()
     
+    print(f"Loaded {records} records in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)")
     print(f"Database setup complete. {records} records loaded.")
     return db_path
 
+def compile_catalog(snapshot_path, data_source="database", source_path=None):
+    """
+    Compile the HSN catalog into a memory-mappable snapshot.
+    
+    Args:
+        snapshot_path (str): Path of the snapshot file to write
+        data_source (str): Type of data source to compile from ('database', 'csv', 'json')
+        source_path (str): Path to the data source
+    
+    Returns:
+        int: Number of records written
+    """
+    loader = HSNDataLoader(data_source, source_path)
+    if not loader.load_data():
+        return 0
+    records = ((record.hsn_code, record.description) for record in loader.index.iter_records())
+    count = compile_snapshot(records, snapshot_path)
+    loader.close()
+    return count
+
+def export_catalog(json_path, layout="jsonl", data_source="database", source_path=None):
+    """
+    Export the HSN catalog as JSON.
+    
+    Args:
+        json_path (str): Path of the JSON file to write
+        layout (str): 'jsonl' for one record per line, 'chapters' for records grouped by chapter
+        data_source (str): Type of data source to export from ('database', 'csv', 'snapshot')
+        source_path (str): Path to the data source
+    
+    Returns:
+        int: Number of records written
+    """
+    loader = HSNDataLoader(data_source, source_path)
+    if not loader.load_data():
+        return 0
+    records = ((record.hsn_code, record.description) for record in loader.index.iter_records())
+    count = export_json(records, json_path, layout)
+    loader.close()
+    return count
+
+def catalog_memory_report(data_source="database", source_path=None):
+    """
+    Load the HSN catalog and report the memory its index holds.
+    
+    Args:
+        data_source (str): Type of data source ('database', 'csv', 'json', 'snapshot')
+        source_path (str): Path to the data source
+    
+    Returns:
+        dict: Memory report from HSNDataLoader.memory_report, or None if loading failed
+    """
+    loader = HSNDataLoader(data_source, source_path)
+    if not loader.load_data():
+        return None
+    report = loader.memory_report()
+    loader.close()
+    return report
+
 def validate_code(hsn_code, data_source="database", source_path=None):
     """
     Validate an HSN code.
@@ -42,12 +113,81 @@ def validate_code(hsn_code, data_source="database", source_path=None):
     agent.close()
     return result
 
-def search_description(description, data_source="database", source_path=None):
+def read_codes(stream, column=None):
     """
-    Search for HSN codes by description.
+    Read HSN codes, or other values such as descriptions, from a text stream.
+    
+    Args:
+        stream (file): Text stream with one value per line, or CSV data
+        column (str): CSV column holding the values. If None, each line is a value
+    
+    Yields:
+        str: Stripped values, skipping blank lines
+    """
+    if column:
+        for row in csv.DictReader(stream):
+            code = (row.get(column) or '').strip()
+            if code:
+                yield code
+    else:
+        for line in stream:
+            code = line.strip()
+            if code:
+                yield code
+
+def validate_batch(codes, output, data_source="database", source_path=None):
+    """
+    Validate a stream of HSN codes and write JSONL results.
+    
+    Args:
+        codes (iterable): HSN codes to validate
+        output (file): Text stream the JSON lines are written to
+    
+    Returns:
+        int: Number of codes validated
     """
     agent = HSNCodeAgent(data_source, source_path)
-    results = agent.search_by_description(description)
+    count = 0
+    try:
+        for result in agent.validate_many(codes):
+            output.write(json.dumps(result, default=json_default) + "\n")
+            count += 1
+    finally:
+        agent.close()
+    return count
+
+def classify_batch(descriptions, output, top_k=5, data_source="database", source_path=None):
+    """
+    Classify a stream of product descriptions and write JSONL results.
+    
+    Args:
+        descriptions (iterable): Free-text product descriptions
+        output (file): Text stream the JSON lines are written to
+        top_k (int): Number of candidate codes per description
+    
+    Returns:
+        int: Number of descriptions classified
+    """
+    agent = HSNCodeAgent(data_source, source_path)
+    count = 0
+    start_time = time.perf_counter()
+    try:
+        for result in agent.classify_many(descriptions, top_k):
+            output.write(json.dumps(result, default=json_default) + "\n")
+            count += 1
+    finally:
+        agent.close()
+    elapsed = time.perf_counter() - start_time
+    print(f"Classified {count} descriptions in {elapsed:.2f}s "
+          f"({count / elapsed * 60 if elapsed > 0 else 0:.0f} per minute)", file=sys.stderr)
+    return count
+
+def search_description(description, data_source="database", source_path=None, limit=None, offset=0, fuzzy=False):
+    """
+    Search for HSN codes by description.
+    """
+    agent = HSNCodeAgent(data_source, source_path, fuzzy=fuzzy)
+    results = agent.search_by_description(description, limit, offset, fuzzy)
     agent.close()
     return results
 
@@ -60,6 +200,16 @@ def extract_codes(text, data_source="database", source_path=None):
     agent.close()
     return results
 
+def extract_codes_from_stream(stream, data_source="database", source_path=None):
+    """
+    Extract and validate HSN codes from a text stream, yielding results as they are found.
+    """
+    agent = HSNCodeAgent(data_source, source_path)
+    try:
+        yield from agent.extract_hsn_codes_stream(stream)
+    finally:
+        agent.close()
+
 def interactive_mode(data_source="database", source_path=None):
     """
     Run the agent in interactive mode.
@@ -91,6 +241,10 @@ def interactive_mode(data_source="database", source_path=None):
                     print("\nParent Categories:")
                     for parent in result['parent_codes']:
                         print(f"  {parent['hsn_code']}: {parent['description']}")
+                if 'suggestions' in result:
+                    print("\nDid you mean:")
+                    for suggestion in result['suggestions']:
+                        print(f"  {suggestion['hsn_code']}: {suggestion['description']}")
             else:
                 print(f"Description: {result['details']['description']}")
         
@@ -99,14 +253,7 @@ def interactive_mode(data_source="database", source_path=None):
             results = agent.search_by_description(description)
             print(f"\nFound {len(results)} matching records:")
             for i, result in enumerate(results, 1):
-                if isinstance(result, dict):
-                    if 'hsn_code' in result:
-                        code = result['hsn_code']
-                        desc = result['description']
-                    else:
-                        code = result.get('HSNCode', 'N/A')
-                        desc = result.get('Description', 'N/A')
-                    print(f"{i}. {code}: {desc}")
+                print(f"{i}. {result['hsn_code']}: {result['description']}")
         
         elif choice == "3":
             text = input("Enter text to extract HSN codes from: ")
@@ -130,6 +277,9 @@ def interactive_mode(data_source="database", source_path=None):
 
 def main():
     parser = argparse.ArgumentParser(description="HSN Code Validation Agent")
+    parser.add_argument("--source", choices=["database", "csv", "json", "snapshot"], default="database",
+                        help="Data source to load the catalog from (default: database)")
+    parser.add_argument("--source-path", help="Path to the data source (default: the source's standard file)")
     
     # Define subparsers for different commands
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
@@ -137,17 +287,66 @@ def main():
     # Setup command
     setup_parser = subparsers.add_parser("setup", help="Set up the database")
     
+    # Compile command
+    compile_parser = subparsers.add_parser("compile", help="Compile the catalog into a memory-mappable snapshot")
+    compile_parser.add_argument("--output", help="Snapshot file to write (default: hsn_codes.snap)")
+    
+    # Update command
+    update_parser = subparsers.add_parser("update", help="Apply a new cleaned CSV to the database incrementally")
+    update_parser.add_argument("file", help="New cleaned CSV with HSNCode and Description columns")
+    update_parser.add_argument("--dry-run", action="store_true", help="Only report the differences")
+    
+    # Export command
+    export_parser = subparsers.add_parser("export-json", help="Export the catalog as JSON for the json source")
+    export_parser.add_argument("--output", help="JSON file to write (default: hsn_codes.json)")
+    export_parser.add_argument("--format", choices=LAYOUTS, default="jsonl",
+                               help="'jsonl' for one record per line, 'chapters' for records grouped by chapter (default: jsonl)")
+    
+    # Memory report command
+    subparsers.add_parser("memory", help="Report the memory used by the loaded catalog per record")
+    
     # Validate command
     validate_parser = subparsers.add_parser("validate", help="Validate an HSN code")
     validate_parser.add_argument("code", help="HSN code to validate")
     
+    # Batch validate command
+    batch_parser = subparsers.add_parser("validate-batch", help="Validate HSN codes from a file or stdin, writing JSONL to stdout")
+    batch_parser.add_argument("--file", default="-", help="Input file with one code per line, or CSV with --column (default: stdin)")
+    batch_parser.add_argument("--column", help="CSV column holding the HSN codes")
+    
+    # Classify command
+    classify_parser = subparsers.add_parser("classify", help="Rank candidate HSN codes for product descriptions from a file or stdin, writing JSONL to stdout")
+    classify_parser.add_argument("--file", default="-", help="Input file with one description per line, or CSV with --column (default: stdin)")
+    classify_parser.add_argument("--column", help="CSV column holding the descriptions")
+    classify_parser.add_argument("--top-k", type=int, default=5, help="Number of candidate codes per description (default: 5)")
+    
     # Search command
     search_parser = subparsers.add_parser("search", help="Search for HSN codes by description")
-    search_parser.add_argument("description", help="Description to search for")
+    search_parser.add_argument("description", help="Description to search for (a trailing '*' matches a word prefix)")
+    search_parser.add_argument("--limit", type=int, help="Maximum number of results")
+    search_parser.add_argument("--offset", type=int, default=0, help="Number of results to skip")
+    search_parser.add_argument("--fuzzy", action="store_true", help="Typo-tolerant search (e.g. 'hores' finds 'horses')")
     
     # Extract command
     extract_parser = subparsers.add_parser("extract", help="Extract HSN codes from text")
-    extract_parser.add_argument("text", help="Text to extract HSN codes from")
+    extract_parser.add_argument("text", nargs="?", help="Text to extract HSN codes from")
+    extract_parser.add_argument("--file", help="Stream text from this file instead ('-' for stdin)")
+    
+    # Extract from a directory of documents
+    extract_dir_parser = subparsers.add_parser("extract-dir", help="Extract HSN codes from many documents in parallel")
+    extract_dir_parser.add_argument("inputs", nargs="+", help="Directories, glob patterns or files to process")
+    extract_dir_parser.add_argument("--output", required=True, help="Merged output file")
+    extract_dir_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Output format (default: jsonl)")
+    extract_dir_parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    extract_dir_parser.add_argument("--checkpoint", help="Checkpoint file; rerunning with it resumes an interrupted run")
+    extract_dir_parser.add_argument("--pattern", default="*.txt", help="File pattern for directory inputs (default: *.txt)")
+    extract_dir_parser.add_argument("--stats", help="Write per-file statistics as JSON to this file")
+    
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Serve the agent over HTTP/JSON with a warm catalog")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind to (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    serve_parser.add_argument("--instrument", action="store_true", help="Collect metrics exposed on /stats and /metrics")
     
     # Interactive command
     interactive_parser = subparsers.add_parser("interactive", help="Run in interactive mode")
@@ -159,16 +358,79 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = os.path.join(script_dir, "hsn_codes.db")
     
+    # Resolve the data source used by the agent commands
+    data_source = args.source
+    source_path = args.source_path
+    if not source_path:
+        default_paths = {
+            "database": db_path,
+            "csv": os.path.join(script_dir, "Tests", "HSN_codes_cleaned.csv"),
+            "json": os.path.join(script_dir, "hsn_codes.json"),
+            "snapshot": os.path.join(script_dir, "hsn_codes.snap")
+        }
+        source_path = default_paths[data_source]
+    
     # Execute the appropriate command
     if args.command == "setup":
         setup_database()
     
+    elif args.command == "compile":
+        if data_source == "snapshot":
+            parser.error("compile reads from a database, csv or json source")
+        if data_source == "database" and not os.path.exists(source_path):
+            print("Database not found. Running setup first...")
+            setup_database()
+        
+        output = args.output or os.path.join(script_dir, "hsn_codes.snap")
+        records = compile_catalog(output, data_source, source_path)
+        print(f"Snapshot written to {output}. {records} records compiled.")
+    
+    elif args.command == "update":
+        if data_source != "database":
+            parser.error("update applies to the database source")
+        if not os.path.exists(source_path):
+            parser.error(f"Database {source_path} not found. Run setup first")
+        
+        db = HSNDatabase(source_path)
+        summary = db.update_from_csv(args.file, dry_run=args.dry_run)
+        db.close()
+        action = "Would apply" if args.dry_run else "Applied"
+        print(f"{action} {summary['inserted']} inserts, {summary['updated']} updates and "
+              f"{summary['deleted']} deletes in {summary['seconds']:.2f}s. Dataset version: {summary['version']}")
+    
+    elif args.command == "export-json":
+        if data_source == "json":
+            parser.error("export-json reads from a database, csv or snapshot source")
+        if data_source == "database" and not os.path.exists(source_path):
+            print("Database not found. Running setup first...")
+            setup_database()
+        
+        output = args.output or os.path.join(script_dir, "hsn_codes.json")
+        records = export_catalog(output, args.format, data_source, source_path)
+        print(f"JSON catalog written to {output}. {records} records exported.")
+    
+    elif args.command == "memory":
+        if data_source == "database" and not os.path.exists(source_path):
+            print("Database not found. Running setup first...")
+            setup_database()
+        
+        report = catalog_memory_report(data_source, source_path)
+        if report is None:
+            sys.exit(1)
+        print(f"Source: {report['source']}")
+        print(f"Records: {report['records']}")
+        print(f"Index size: {report['bytes']} bytes ({report['bytes_per_record']:.1f} bytes per record)")
+        if report['unique_descriptions'] is not None:
+            print(f"Descriptions: {report['description_bytes']} bytes in {report['unique_descriptions']} distinct strings")
+        else:
+            print(f"Descriptions: {report['description_bytes']} bytes (memory-mapped)")
+    
     elif args.command == "validate":
-        if not os.path.exists(db_path):
+        if data_source == "database" and not os.path.exists(source_path):
             print("Database not found. Running setup first...")
             setup_database()
         
-        result = validate_code(args.code, "database", db_path)
+        result = validate_code(args.code, data_source, source_path)
         print(f"Code: {result['code']}")
         print(f"Valid: {result['valid']}")
         
@@ -178,39 +440,109 @@ def main():
                 print("\nParent Categories:")
                 for parent in result['parent_codes']:
                     print(f"  {parent['hsn_code']}: {parent['description']}")
+            if 'suggestions' in result:
+                print("\nDid you mean:")
+                for suggestion in result['suggestions']:
+                    print(f"  {suggestion['hsn_code']}: {suggestion['description']}")
         else:
             print(f"Description: {result['details']['description']}")
     
+    elif args.command == "validate-batch":
+        if data_source == "database" and not os.path.exists(source_path):
+            # Setup progress goes to stderr so stdout carries only the JSONL stream
+            with contextlib.redirect_stdout(sys.stderr):
+                print("Database not found. Running setup first...")
+                setup_database()
+        
+        if args.file == "-":
+            validate_batch(read_codes(sys.stdin, args.column), sys.stdout, data_source, source_path)
+        else:
+            with open(args.file, newline='') as f:
+                validate_batch(read_codes(f, args.column), sys.stdout, data_source, source_path)
+    
+    elif args.command == "classify":
+        if data_source == "database" and not os.path.exists(source_path):
+            # Setup progress goes to stderr so stdout carries only the JSONL stream
+            with contextlib.redirect_stdout(sys.stderr):
+                print("Database not found. Running setup first...")
+                setup_database()
+        
+        if args.file == "-":
+            classify_batch(read_codes(sys.stdin, args.column), sys.stdout, args.top_k, data_source, source_path)
+        else:
+            with open(args.file, newline='') as f:
+                classify_batch(read_codes(f, args.column), sys.stdout, args.top_k, data_source, source_path)
+    
     elif args.command == "search":
-        if not os.path.exists(db_path):
+        if data_source == "database" and not os.path.exists(source_path):
             print("Database not found. Running setup first...")
             setup_database()
         
-        results = search_description(args.description, "database", db_path)
+        results = search_description(args.description, data_source, source_path, args.limit, args.offset, args.fuzzy)
         print(f"Found {len(results)} matching records:")
         for i, result in enumerate(results, 1):
-            print(f"{i}. {result['hsn_code']}: {result['description']}")
+            if 'score' in result:
+                print(f"{i}. {result['hsn_code']}: {result['description']} (score {result['score']})")
+            else:
+                print(f"{i}. {result['hsn_code']}: {result['description']}")
     
     elif args.command == "extract":
-        if not os.path.exists(db_path):
+        if data_source == "database" and not os.path.exists(source_path):
             print("Database not found. Running setup first...")
             setup_database()
         
-        results = extract_codes(args.text, "database", db_path)
-        print(f"Extracted {len(results)} potential HSN codes:")
-        for i, result in enumerate(results, 1):
-            print(f"{i}. {result['code']} - Valid: {result['valid']}")
-            if not result['valid']:
-                print(f"   Reason: {result['reason']}")
-            else:
-                print(f"   Description: {result['details']['description']}")
+        if args.file:
+            stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8", errors="replace")
+            count = 0
+            try:
+                for count, result in enumerate(extract_codes_from_stream(stream, data_source, source_path), 1):
+                    print(f"{count}. {result['code']} (chars {result['start']}-{result['end']}) - Valid: {result['valid']}")
+                    if not result['valid']:
+                        print(f"   Reason: {result['reason']}")
+                    else:
+                        print(f"   Description: {result['details']['description']}")
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+            print(f"Extracted {count} potential HSN codes.")
+        else:
+            if args.text is None:
+                parser.error("extract needs TEXT or --file")
+            results = extract_codes(args.text, data_source, source_path)
+            print(f"Extracted {len(results)} potential HSN codes:")
+            for i, result in enumerate(results, 1):
+                print(f"{i}. {result['code']} - Valid: {result['valid']}")
+                if not result['valid']:
+                    print(f"   Reason: {result['reason']}")
+                else:
+                    print(f"   Description: {result['details']['description']}")
+    
+    elif args.command == "extract-dir":
+        if data_source == "database" and not os.path.exists(source_path):
+            print("Database not found. Running setup first...")
+            setup_database()
+        
+        from corpus import extract_directory
+        stats = extract_directory(args.inputs, args.output, args.format, args.workers, args.checkpoint,
+                                  args.pattern, data_source, source_path)
+        if args.stats:
+            with open(args.stats, "w") as f:
+                json.dump(stats, f, indent=2)
+    
+    elif args.command == "serve":
+        if data_source == "database" and not os.path.exists(source_path):
+            print("Database not found. Running setup first...")
+            setup_database()
+        
+        from server import run_server
+        run_server(args.host, args.port, data_source, source_path, args.instrument)
     
     elif args.command == "interactive":
-        if not os.path.exists(db_path):
+        if data_source == "database" and not os.path.exists(source_path):
             print("Database not found. Running setup first...")
             setup_database()
         
-        interactive_mode("database", db_path)
+        interactive_mode(data_source, source_path)
     
     else:
         parser.print_help()
@@ -0,0 +1,164 @@
+import bisect
+import threading
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction):
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.50),
+            'p99': self.quantile(0.99)
+        }
+
+
+class Metrics:
+    """
+    Opt-in counters and latency histograms for the agent and database layer.
+    Components hold a Metrics instance only when instrumentation is enabled,
+    so the disabled path costs a single None check.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        # Counters of the calling thread's own increments, never reset
+        self.local = threading.local()
+
+    def increment(self, name, value=1):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Counter name
+            value (int): Amount to add
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        try:
+            counters = self.local.counters
+        except AttributeError:
+            counters = self.local.counters = {}
+        counters[name] = counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """
+        Record a latency observation.
+
+        Args:
+            name (str): Histogram name
+            seconds (float): Observed latency in seconds
+        """
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def get(self, name):
+        """
+        Get a counter value (0 if it was never incremented).
+        """
+        return self.counters.get(name, 0)
+
+    def thread_total(self, name):
+        """
+        Get the total added to a counter by the calling thread.
+
+        Unlike get(), this excludes increments made concurrently by other
+        threads, so the difference between two calls counts the work done in
+        between by this thread alone.
+        """
+        return getattr(self.local, 'counters', {}).get(name, 0)
+
+    def reset(self):
+        """
+        Clear all counters and histograms.
+        """
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def stats(self):
+        """
+        Get a snapshot of all counters and histogram summaries.
+
+        Returns:
+            dict: {'counters': {...}, 'latency_seconds': {...}}
+        """
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'latency_seconds': {name: histogram.stats() for name, histogram in self.histograms.items()}
+            }
+
+    def to_prometheus(self, prefix='hsn_', gauges=None):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix added to every metric name
+            gauges (dict): Extra gauge values to include
+
+        Returns:
+            str: Metrics in Prometheus text format
+        """
+        lines = []
+        with self.lock:
+            for name in sorted(self.counters):
+                metric = f"{prefix}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self.counters[name]}")
+
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                metric = f"{prefix}{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+
+        for name, value in sorted((gauges or {}).items()):
+            metric = f"{prefix}{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
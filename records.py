@@ -0,0 +1,116 @@
+import sys
+
+class HSNRecord:
+    """
+    Immutable HSN catalog record returned by every data source.
+
+    A slotted object holding only the code and the description, a fraction
+    of the size of a dict per record. Fields are read as attributes
+    (record.hsn_code) or, like the dicts records used to be, by key
+    (record['hsn_code'], dict(record), record.get('description')).
+    """
+
+    __slots__ = ('hsn_code', 'description')
+    _fields = ('hsn_code', 'description')
+
+    def __init__(self, hsn_code, description):
+        object.__setattr__(self, 'hsn_code', hsn_code)
+        object.__setattr__(self, 'description', description)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HSNRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HSNRecord is immutable")
+
+    def __reduce__(self):
+        return (HSNRecord, (self.hsn_code, self.description))
+
+    def __getitem__(self, key):
+        if key == 'hsn_code':
+            return self.hsn_code
+        if key == 'description':
+            return self.description
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, HSNRecord):
+            return self.hsn_code == other.hsn_code and self.description == other.description
+        if isinstance(other, dict):
+            return other == self.to_dict()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.hsn_code, self.description))
+
+    def __repr__(self):
+        return f"HSNRecord(hsn_code={self.hsn_code!r}, description={self.description!r})"
+
+    def to_dict(self):
+        """
+        Get the record as a plain dict.
+
+        Returns:
+            dict: Dict with 'hsn_code' and 'description'
+        """
+        return {'hsn_code': self.hsn_code, 'description': self.description}
+
+
+def make_record(hsn_code, description):
+    """
+    Create a record for an index, storing its description in the interned
+    string table so repeated descriptions are held in memory only once.
+
+    Args:
+        hsn_code (str): HSN code
+        description (str): Description of the code
+
+    Returns:
+        HSNRecord: The record
+    """
+    return HSNRecord(hsn_code, sys.intern(description))
+
+def json_default(obj):
+    """
+    JSON encoder hook for records, for use as json.dumps(..., default=json_default).
+    """
+    if isinstance(obj, HSNRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def strings_size(strings):
+    """
+    Get the memory used by a collection of strings, counting each distinct
+    string object once.
+
+    Args:
+        strings (iterable): Strings to measure
+
+    Returns:
+        tuple: (total bytes, number of distinct string objects)
+    """
+    seen = set()
+    total = 0
+    for string in strings:
+        if id(string) not in seen:
+            seen.add(id(string))
+            total += sys.getsizeof(string)
+    return total, len(seen)
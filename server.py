@@ -0,0 +1,386 @@
+import asyncio
+import json
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from agent import HSNCodeAgent
+from records import json_default
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+class HTTPError(Exception):
+    """
+    Error that is returned to the client as a JSON error response.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class HSNServer:
+    """
+    HTTP/JSON server exposing a single warm HSNCodeAgent on an asyncio event loop.
+
+    The agent's blocking work (SQLite queries, pandas scans, classification)
+    runs on a bounded thread pool, so a slow request never stalls the
+    event loop for the other connections.
+
+    Endpoints:
+        GET  /health
+        GET  /stats
+        GET  /metrics          (Prometheus text format)
+        GET  /validate?code=01011010
+        GET  /search?q=live+horses&limit=10&offset=0&fuzzy=1
+        GET  /parents?code=01011010
+        GET  /children?code=0101   (no code for the top-level codes)
+        GET  /subtree?code=01&depth=2
+        POST /extract          {"text": "..."}
+        POST /validate-batch   {"codes": ["0101", ...]}
+        POST /classify         {"descriptions": ["live horses", ...], "top_k": 5}
+    """
+
+    def __init__(self, agent, host="127.0.0.1", port=8000, keepalive_timeout=15.0, max_body_size=10 * 1024 * 1024,
+                 max_workers=4):
+        """
+        Initialize the server.
+
+        Args:
+            agent (HSNCodeAgent): Agent used to answer requests
+            host (str): Interface to bind to
+            port (int): Port to listen on
+            keepalive_timeout (float): Seconds an idle keep-alive connection is kept open
+            max_body_size (int): Maximum accepted request body size in bytes
+            max_workers (int): Maximum number of threads running agent calls
+        """
+        self.agent = agent
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hsn-server")
+        self.server = None
+        self.connections = set()
+        self.idle_connections = set()
+        self.routes = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/stats'): self.handle_stats,
+            ('GET', '/metrics'): self.handle_metrics,
+            ('GET', '/validate'): self.handle_validate,
+            ('GET', '/search'): self.handle_search,
+            ('GET', '/parents'): self.handle_parents,
+            ('GET', '/children'): self.handle_children,
+            ('GET', '/subtree'): self.handle_subtree,
+            ('POST', '/extract'): self.handle_extract,
+            ('POST', '/validate-batch'): self.handle_validate_batch,
+            ('POST', '/classify'): self.handle_classify
+        }
+
+    async def start(self):
+        """
+        Start listening for connections.
+        """
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        return self.server
+
+    async def stop(self, grace_period=5.0):
+        """
+        Stop accepting connections and wait for in-flight requests to finish.
+
+        Idle keep-alive connections are closed right away; connections with
+        a request in progress close once its response is written.
+
+        Args:
+            grace_period (float): Seconds to wait for in-flight requests before cancelling them
+        """
+        server = self.server
+        if server:
+            server.close()
+            self.server = None
+
+        for task in self.idle_connections:
+            task.cancel()
+        if self.connections:
+            _, pending = await asyncio.wait(self.connections, timeout=grace_period)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        if server:
+            await server.wait_closed()
+
+        # Let agent calls already on the pool finish before the agent is closed
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def serve_forever(self):
+        """
+        Serve until SIGINT or SIGTERM is received, then shut down gracefully.
+        """
+        await self.start()
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are not available on every platform (e.g. Windows)
+                pass
+
+        print(f"Serving HSN Code Validation Agent on http://{self.host}:{self.port}")
+        try:
+            await stop_event.wait()
+        finally:
+            print("Shutting down...")
+            await self.stop()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Handle one client connection, serving requests until it is closed.
+        """
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                # Between requests the connection is idle and stop() may close it at once
+                self.idle_connections.add(task)
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                finally:
+                    self.idle_connections.discard(task)
+
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader, request_line), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    await self.write_response(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                method, target, version, headers, body = request
+                keep_alive = self.wants_keep_alive(version, headers)
+                status, payload = await self.dispatch(method, target, body)
+                # A server shutting down closes the connection after this response
+                keep_alive = keep_alive and self.server is not None
+                await self.write_response(writer, status, payload, keep_alive)
+
+                if not keep_alive or self.server is None:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled by stop(): the connection is simply closed
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader, request_line):
+        """
+        Read the rest of one HTTP/1.x request after its request line.
+
+        Returns:
+            tuple: (method, target, version, headers, body), or None if the connection was closed
+        """
+        if not request_line:
+            return None
+
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length > self.max_body_size:
+            raise HTTPError(413, 'Request body too large')
+
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, version.upper(), headers, body
+
+    def wants_keep_alive(self, version, headers):
+        """
+        Decide whether the connection should stay open after the response.
+        """
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    async def dispatch(self, method, target, body):
+        """
+        Route a request to its handler.
+
+        Returns:
+            tuple: (status, payload)
+        """
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return 405, {'error': f'Method {method} not allowed for {url.path}'}
+            return 404, {'error': f'Unknown endpoint {url.path}'}
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'POST':
+                try:
+                    params.update(json.loads(body or b'{}'))
+                except (ValueError, TypeError, AttributeError):
+                    raise HTTPError(400, 'Request body must be a JSON object')
+            return 200, await handler(params)
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        """
+        Write a JSON response, or a plain-text one if the payload is a string.
+        """
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+        else:
+            body = json.dumps(payload, default=json_default).encode('utf-8')
+            content_type = 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def call(self, func, *args):
+        """
+        Run a blocking agent call on the thread pool.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def handle_health(self, params):
+        return {'status': 'ok'}
+
+    async def handle_stats(self, params):
+        return await self.call(self.agent.stats)
+
+    async def handle_metrics(self, params):
+        return await self.call(self.agent.metrics_text)
+
+    async def handle_validate(self, params):
+        if 'code' not in params:
+            raise HTTPError(400, "Missing 'code' parameter")
+        return await self.call(self.agent.validate_hsn_code, params['code'])
+
+    async def handle_search(self, params):
+        query = params.get('q') or params.get('description')
+        if not query:
+            raise HTTPError(400, "Missing 'q' parameter")
+        try:
+            limit = int(params['limit']) if params.get('limit') is not None else None
+            offset = int(params.get('offset', 0))
+        except ValueError:
+            raise HTTPError(400, "'limit' and 'offset' must be integers")
+        fuzzy = str(params.get('fuzzy', '')).lower() in ('1', 'true', 'yes')
+        results = await self.call(self.agent.search_by_description, query, limit, offset, fuzzy)
+        return {'count': len(results), 'results': results}
+
+    async def handle_parents(self, params):
+        if 'code' not in params:
+            raise HTTPError(400, "Missing 'code' parameter")
+        results = await self.call(self.agent.get_parents, params['code'])
+        return {'count': len(results), 'results': results}
+
+    async def handle_children(self, params):
+        results = await self.call(self.agent.get_children, params.get('code'))
+        return {'count': len(results), 'results': results}
+
+    async def handle_subtree(self, params):
+        if 'code' not in params:
+            raise HTTPError(400, "Missing 'code' parameter")
+        try:
+            depth = int(params['depth']) if params.get('depth') is not None else None
+        except ValueError:
+            raise HTTPError(400, "'depth' must be an integer")
+        results = await self.call(self.agent.get_subtree, params['code'], depth)
+        return {'count': len(results), 'results': results}
+
+    async def handle_extract(self, params):
+        text = params.get('text')
+        if not isinstance(text, str):
+            raise HTTPError(400, "Missing 'text' field")
+        results = await self.call(self.agent.extract_hsn_codes, text)
+        return {'count': len(results), 'results': results}
+
+    async def handle_validate_batch(self, params, chunk_size=1000):
+        codes = params.get('codes')
+        if not isinstance(codes, list):
+            raise HTTPError(400, "Missing 'codes' list")
+
+        # The agent yields results lazily, so each chunk is also consumed on the pool
+        results = []
+        for start in range(0, len(codes), chunk_size):
+            results.extend(await self.call(list, self.agent.validate_many(codes[start:start + chunk_size])))
+        return {'count': len(results), 'results': results}
+
+    async def handle_classify(self, params, chunk_size=1000):
+        descriptions = params.get('descriptions')
+        if not isinstance(descriptions, list):
+            raise HTTPError(400, "Missing 'descriptions' list")
+        try:
+            top_k = int(params.get('top_k', 5))
+        except (ValueError, TypeError):
+            raise HTTPError(400, "'top_k' must be an integer")
+
+        # The agent yields results lazily, so each chunk is also consumed on the pool
+        results = []
+        for start in range(0, len(descriptions), chunk_size):
+            chunk = descriptions[start:start + chunk_size]
+            results.extend(await self.call(list, self.agent.classify_many(chunk, top_k, chunk_size)))
+        return {'count': len(results), 'results': results}
+
+
+def run_server(host="127.0.0.1", port=8000, data_source="database", source_path=None, instrument=False):
+    """
+    Load the agent once and serve it until interrupted. The fuzzy search
+    index is built with the catalog, so the first /search?fuzzy=1 request
+    is as fast as the rest.
+
+    Args:
+        host (str): Interface to bind to
+        port (int): Port to listen on
+        data_source (str): Type of data source ('database', 'csv', 'json', 'snapshot')
+        source_path (str): Path to the data source
+        instrument (bool): Collect per-operation metrics for /stats and /metrics
+    """
+    agent = HSNCodeAgent(data_source, source_path, instrument=instrument, fuzzy=True)
+    try:
+        asyncio.run(HSNServer(agent, host, port).serve_forever())
+    finally:
+        agent.close()
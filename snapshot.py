@@ -0,0 +1,233 @@
+import mmap
+import os
+import struct
+from records import HSNRecord
+
+MAGIC = b'HSNSNAP1'
+HEADER = struct.Struct('<8sII')
+OFFSET_SIZE = 8
+
+def compile_snapshot(records, snapshot_path, key_width=8):
+    """
+    Write HSN codes into a compact binary snapshot.
+
+    Layout (little-endian):
+        header   magic, key width, record count
+        keys     sorted codes, each null-padded to the key width
+        offsets  count + 1 unsigned 64-bit offsets into the string blob
+        blob     UTF-8 descriptions, concatenated in key order
+
+    The file is written to a temporary path and moved into place, so
+    processes that have the previous snapshot mapped keep a consistent view.
+
+    Args:
+        records (iterable): Iterable of (hsn_code, description) pairs
+        snapshot_path (str): Path of the snapshot file to write
+        key_width (int): Fixed width of a code key in bytes
+
+    Returns:
+        int: Number of records written
+    """
+    catalog = {}
+    for hsn_code, description in records:
+        hsn_code = str(hsn_code).strip()
+        if len(hsn_code) > key_width:
+            raise ValueError(f"HSN code '{hsn_code}' is longer than the snapshot key width ({key_width})")
+        catalog[hsn_code] = str(description).strip()
+
+    codes = sorted(catalog)
+    blob = bytearray()
+    offsets = [0]
+    for hsn_code in codes:
+        blob += catalog[hsn_code].encode('utf-8')
+        offsets.append(len(blob))
+
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, key_width, len(codes)))
+        f.write(b''.join(hsn_code.encode('ascii').ljust(key_width, b'\0') for hsn_code in codes))
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        f.write(blob)
+    os.replace(tmp_path, snapshot_path)
+    return len(codes)
+
+
+class HSNSnapshot:
+    """
+    Read-only, memory-mapped view of a compiled HSN catalog snapshot.
+    Provides the same lookup interface as HSNCodeIndex. Lookups binary
+    search the mapped key table, so opening a snapshot costs the same
+    regardless of catalog size, and processes mapping the same file share
+    its pages.
+    """
+
+    def __init__(self, snapshot_path):
+        """
+        Open and map a snapshot file.
+
+        Args:
+            snapshot_path (str): Path to the snapshot file
+        """
+        self.snapshot_path = snapshot_path
+        with open(snapshot_path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.key_width, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(f"{snapshot_path} is not an HSN snapshot")
+
+        self.keys_start = HEADER.size
+        self.offsets_start = self.keys_start + self.count * self.key_width
+        self.blob_start = self.offsets_start + (self.count + 1) * OFFSET_SIZE
+        self.offsets = memoryview(self.mm)[self.offsets_start:self.blob_start].cast('Q')
+
+    def close(self):
+        """
+        Unmap the snapshot.
+        """
+        if self.mm is not None:
+            self.offsets.release()
+            self.mm.close()
+            self.mm = None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, hsn_code):
+        return self._find(hsn_code) is not None
+
+    def _key(self, position):
+        start = self.keys_start + position * self.key_width
+        return self.mm[start:start + self.key_width]
+
+    def _code(self, position):
+        return self._key(position).rstrip(b'\0').decode('ascii')
+
+    def _description(self, position):
+        start = self.blob_start + self.offsets[position]
+        end = self.blob_start + self.offsets[position + 1]
+        return self.mm[start:end].decode('utf-8')
+
+    def _record(self, position):
+        return HSNRecord(self._code(position), self._description(position))
+
+    def _bisect(self, key):
+        """
+        Find the first position whose key is not less than the given key.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, hsn_code):
+        """
+        Find the position of an exact code, or None if it is not present.
+        """
+        if len(hsn_code) > self.key_width:
+            return None
+        try:
+            key = hsn_code.encode('ascii').ljust(self.key_width, b'\0')
+        except UnicodeEncodeError:
+            return None
+        position = self._bisect(key)
+        if position < self.count and self._key(position) == key:
+            return position
+        return None
+
+    def existing_codes(self, codes):
+        """
+        Get which of many candidate codes are in the snapshot.
+
+        Each candidate is binary searched in the mapped key table, so
+        nothing is loaded onto the heap and no import beyond the standard
+        library is needed.
+
+        Args:
+            codes (list): Candidate codes
+
+        Returns:
+            list: The candidates present in the snapshot, in input order
+        """
+        return [code for code in codes if self._find(code) is not None]
+
+    def get(self, hsn_code):
+        """
+        Get the record for an exact HSN code.
+
+        Args:
+            hsn_code (str): HSN code to look up
+
+        Returns:
+            HSNRecord: Matching record, or None if the code does not exist
+        """
+        position = self._find(hsn_code)
+        return self._record(position) if position is not None else None
+
+    def parents(self, hsn_code):
+        """
+        Get the existing parent records of an HSN code, broadest first.
+
+        Args:
+            hsn_code (str): HSN code to get the parents of
+
+        Returns:
+            list: List of parent records
+        """
+        parents = []
+        for i in range(2, len(hsn_code), 2):
+            record = self.get(hsn_code[:i])
+            if record is not None:
+                parents.append(record)
+        return parents
+
+    def prefix_search(self, prefix):
+        """
+        Get all records whose code starts with the given prefix.
+
+        Args:
+            prefix (str): Code prefix to search for
+
+        Returns:
+            list: List of matching records ordered by code
+        """
+        if len(prefix) > self.key_width:
+            return []
+        try:
+            encoded = prefix.encode('ascii')
+        except UnicodeEncodeError:
+            return []
+        start = self._bisect(encoded.ljust(self.key_width, b'\0'))
+        end = self._bisect(encoded.ljust(self.key_width, b'\xff'))
+        return [self._record(position) for position in range(start, end)]
+
+    def iter_records(self):
+        """
+        Iterate over all records in code order.
+
+        Yields:
+            HSNRecord: Record with 'hsn_code' and 'description'
+        """
+        for position in range(self.count):
+            yield self._record(position)
+
+    def memory_usage(self):
+        """
+        Measure the memory held by the snapshot. Nothing is copied onto the
+        heap: the whole file is mapped and its pages are shared between the
+        processes that map it.
+
+        Returns:
+            dict: Number of records, mapped bytes and bytes of the description blob
+        """
+        return {
+            'records': self.count,
+            'bytes': len(self.mm),
+            'description_bytes': len(self.mm) - self.blob_start,
+            'unique_descriptions': None
+        }